@@ -1,15 +1,20 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, simpledialog
 import asyncio
 import threading
 import os
-from datetime import datetime, timedelta
-from random import randint
-from openpyxl import Workbook, load_workbook
-from twikit import Client, TooManyRequests, TwitterException
-from twikit.errors import BadRequest, NotFound, Forbidden, Unauthorized, AccountLocked
-from twikit.tweet import Tweet
-import httpx
+import re
+import sys
+import time
+import argparse
+import logging
+import logging.handlers
+from datetime import datetime, timedelta, timezone
+from random import randint, uniform
+
+# openpyxl, twikit and httpx are imported where they are first used so that
+# the window appears without waiting for them (see --benchmark-startup).
+# tkinter is imported by load_gui(), so queue workers and merges run without it.
+tk = ttk = scrolledtext = messagebox = simpledialog = None
+App = CredentialsDialog = None
 
 # Default Configuration (can be overridden by GUI)
 DEFAULT_EXCEL_FILE = 'deprem_tweets_gui_output.xlsx'
@@ -27,6 +32,148 @@ DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT = 2
 DEFAULT_QUERY_KEYWORDS = '("deprem" OR "zelzele")' 
 DEFAULT_LANG = 'tr'
 DEFAULT_PRODUCT = 'Latest' 
+DEFAULT_RETRY_BUDGETS = {'rate_limit': 2, 'network': 3, 'twitter': 1, 'other': 1}
+DEFAULT_RETRY_BASE_DELAYS = {'rate_limit': DEFAULT_RATE_LIMIT_WAIT_SEC, 'network': 10, 'twitter': 2, 'other': 2}
+DEFAULT_RETRY_MAX_DELAY_SEC = 60
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN_SEC = 300
+DEFAULT_BACKFILL_MAX_ATTEMPTS = 2
+DEFAULT_PROFILE_CACHE_FILE = 'user_profile_cache.sqlite3'
+DEFAULT_PROFILE_CACHE_SIZE = 50000
+DEFAULT_PROFILE_CACHE_MAX_AGE_HOURS = 24
+DEFAULT_PROFILE_FETCH_BATCH_SIZE = 10
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_EXPAND_WORKERS = 2
+DEFAULT_EXPAND_QUEUE_SIZE = 500
+DEFAULT_EXPAND_MAX_REPLIES = 100
+DEFAULT_EXPAND_BUDGET_RESERVE = 0.5
+DEFAULT_EXPAND_MAX_ATTEMPTS = 3
+DEFAULT_REFRESH_BATCH_SIZE = 100
+DEFAULT_REFRESH_PRIORITY_AGE_HOURS = 48
+DEFAULT_REFRESH_MODE = 'inplace'
+DEFAULT_QUEUE_UNIT_HOURS = 6
+DEFAULT_QUEUE_LEASE_SEC = 300
+DEFAULT_QUEUE_HEARTBEAT_SEC = 60
+DEFAULT_QUEUE_MAX_ATTEMPTS = 3
+DEFAULT_SEARCH_PAGE_ROWS = 100
+DEFAULT_ENTITY_TOP_N = 10
+DEFAULT_NEAR_DUP_MODE = 'tag'
+DEFAULT_NEAR_DUP_CAPACITY = 50000
+DEFAULT_MINHASH_BANDS = 8
+DEFAULT_MINHASH_ROWS = 4
+DEFAULT_SUMMARY_TOP_USERS = 5
+DEFAULT_SUMMARY_USER_CAPACITY = 200
+DEFAULT_QUANTILE_ACCURACY = 0.01
+DEFAULT_PLAN_MODE = 'off'
+DEFAULT_PLAN_BUDGET_PAGES = 1000
+DEFAULT_PLAN_MIN_PAGES = 1
+DEFAULT_PLAN_PAGE_LATENCY_SEC = 1.5
+DEFAULT_AUTOSAVE_ROWS = 500
+DEFAULT_AUTOSAVE_SEC = 120
+# Autosaves rewrite the whole workbook; at least this many save durations pass between two of them.
+DEFAULT_AUTOSAVE_MIN_GAP_FACTOR = 4
+DEFAULT_SAVE_WAIT_ON_EXIT_SEC = 60
+DEFAULT_PROFILE_TOP_N = 25
+DEFAULT_PROFILE_TRACEMALLOC_FRAMES = 10
+
+DEFAULT_LOG_LEVEL = 'INFO'
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+logger = logging.getLogger("twitterwebkazima")
+OK = 25
+USER_INPUT = 26
+logging.addLevelName(OK, "OK")
+logging.addLevelName(USER_INPUT, "USER_INPUT")
+LOG_LEVEL_NAMES = ["DEBUG", "INFO", "OK", "WARNING", "ERROR", "CRITICAL"]
+
+def log_context(account=None, since_dt=None, until_dt=None, page=None):
+    """Structured fields for `extra=`; rendering is left to the handlers."""
+    return {'account': account, 'interval': (since_dt, until_dt) if since_dt else None, 'page': page}
+
+def set_log_level(level_name):
+    level_name = "WARNING" if level_name == "WARN" else level_name
+    level = logging.getLevelName(level_name)
+    logger.setLevel(level if isinstance(level, int) else logging.INFO)
+
+class ContextFormatter(logging.Formatter):
+    """'account | HH:MM–HH:MM: message', the layout the log panel always used."""
+
+    def format(self, record):
+        message = record.getMessage()
+        interval = getattr(record, 'interval', None)
+        account = getattr(record, 'account', None)
+        if interval:
+            message = f"{interval[0]:%H:%M}–{interval[1]:%H:%M}: {message}"
+        if account:
+            message = f"{account} | {message}"
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        import json
+
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        account = getattr(record, 'account', None)
+        interval = getattr(record, 'interval', None)
+        page = getattr(record, 'page', None)
+        if account:
+            entry['account'] = account
+        if interval:
+            entry['since'], entry['until'] = interval[0].isoformat(), interval[1].isoformat()
+        if page is not None:
+            entry['page'] = page
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class CallbackLogHandler(logging.Handler):
+    """Forwards records to a UI callback such as App.log_message."""
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+        self.setFormatter(ContextFormatter())
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record), record.levelname)
+        except Exception:
+            self.handleError(record)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Message formatting happens on the listener thread, not on the caller's.
+        return record
+
+class FileLogSink:
+    """Rotating JSON-lines log file written by a background QueueListener thread."""
+
+    def __init__(self, path, max_bytes=DEFAULT_LOG_MAX_BYTES, backup_count=DEFAULT_LOG_BACKUP_COUNT):
+        import queue
+
+        self.path = path
+        log_queue = queue.SimpleQueue()
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding='utf-8', delay=True)
+        file_handler.setFormatter(JsonLinesFormatter())
+        self.queue_handler = _DeferredQueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(log_queue, file_handler)
+
+    def start(self):
+        self.listener.start()
+        logger.addHandler(self.queue_handler)
+
+    def stop(self):
+        logger.removeHandler(self.queue_handler)
+        self.listener.stop()
 
 class CriticalClientError(Exception):
     def __init__(self, message, client_identifier="Bilinmeyen Client"):
@@ -38,7 +185,129 @@ class TemporaryClientError(Exception):
         super().__init__(message)
         self.client_identifier = client_identifier
 
-class CredentialsDialog(simpledialog.Dialog):
+class PageFetchAbandoned(Exception):
+    def __init__(self, message, client_identifier="Bilinmeyen Client"):
+        super().__init__(message)
+        self.client_identifier = client_identifier
+
+class ResourceUnavailable(PageFetchAbandoned):
+    """The requested tweet or user is deleted, protected or unknown; the account itself is fine."""
+
+class RetryPolicy:
+    """Exponential backoff with full jitter and a separate retry budget per error class."""
+
+    ERROR_CLASSES = ('rate_limit', 'network', 'twitter', 'other')
+
+    def __init__(self, budgets=None, base_delays=None, max_delay=DEFAULT_RETRY_MAX_DELAY_SEC):
+        self.budgets = dict(DEFAULT_RETRY_BUDGETS, **(budgets or {}))
+        self.base_delays = dict(DEFAULT_RETRY_BASE_DELAYS, **(base_delays or {}))
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_params(cls, query_params):
+        budgets = {name: query_params[f'retry_budget_{name}'] for name in cls.ERROR_CLASSES if f'retry_budget_{name}' in query_params}
+        return cls(budgets=budgets, max_delay=query_params.get('retry_max_delay_sec', DEFAULT_RETRY_MAX_DELAY_SEC))
+
+    @staticmethod
+    def classify(exc):
+        import httpx
+        from twikit import TooManyRequests, TwitterException
+
+        if isinstance(exc, TooManyRequests):
+            return 'rate_limit'
+        if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError)):
+            return 'network'
+        if isinstance(exc, TwitterException):
+            return 'twitter'
+        return 'other'
+
+    @staticmethod
+    def is_missing_resource(exc):
+        """A deleted, protected or unknown tweet/user: an answer about the resource, not the account."""
+        from twikit.errors import NotFound, TweetNotAvailable, UserNotFound, UserUnavailable
+
+        return isinstance(exc, (NotFound, TweetNotAvailable, UserNotFound, UserUnavailable))
+
+    @staticmethod
+    def counts_against_account(exc, error_class):
+        """Whether an exhausted retry budget is a failure of the account (transport or server side)."""
+        from twikit.errors import RequestTimeout, ServerError
+
+        return error_class == 'network' or isinstance(exc, (RequestTimeout, ServerError))
+
+    def backoff(self, error_class, attempt):
+        return uniform(0, min(self.max_delay, self.base_delays[error_class] * (2 ** attempt)))
+
+    @staticmethod
+    def rate_limit_cooldown(exc, default=DEFAULT_BREAKER_COOLDOWN_SEC):
+        reset_at = getattr(exc, 'rate_limit_reset', None)
+        if reset_at:
+            return max(1, reset_at - time.time())
+        return default
+
+class CircuitBreaker:
+    """Per-client breaker: opens after consecutive failures, half-opens after the cooldown."""
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_FAILURE_THRESHOLD, cooldown_sec=DEFAULT_BREAKER_COOLDOWN_SEC):
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self.failures = 0
+        self.state = 'closed'
+        self.open_until = None
+
+    def allow(self):
+        if self.state == 'open' and self.open_until is not None and time.monotonic() >= self.open_until:
+            self.state = 'half_open'
+        return self.state != 'open'
+
+    @property
+    def is_open(self):
+        return not self.allow()
+
+    def record_success(self):
+        self.failures = 0
+        self.state = 'closed'
+        self.open_until = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self, cooldown=None, permanent=False):
+        self.state = 'open'
+        self.open_until = None if permanent else time.monotonic() + (cooldown if cooldown is not None else self.cooldown_sec)
+
+class RequestBudget:
+    """Token bucket shared by every request made with one account.
+
+    Callers that must not starve the main search pass `reserve`: they only
+    get a token while more than `reserve` tokens remain.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        requests_per_minute = max(1, requests_per_minute)
+        self.rate = requests_per_minute / 60.0
+        self.capacity = requests_per_minute
+        self.tokens = float(requests_per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, reserve=0):
+        while True:
+            self._refill()
+            if self.tokens - 1 >= reserve:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((reserve + 1 - self.tokens) / self.rate)
+
+class CredentialsForm:
+    """Body of CredentialsDialog; load_gui() puts it on top of simpledialog.Dialog."""
+
     def __init__(self, parent, title="Twitter Credentials"):
         self.username_var = tk.StringVar()
         self.email_var = tk.StringVar()
@@ -66,20 +335,81 @@ class CredentialsDialog(simpledialog.Dialog):
         }
 
 class TwitterClientManager:
-    def __init__(self, app_callbacks, lang=DEFAULT_LANG):
-        self.app_callbacks = app_callbacks
+    def __init__(self, lang=DEFAULT_LANG,
+                 breaker_failure_threshold=DEFAULT_BREAKER_FAILURE_THRESHOLD, breaker_cooldown_sec=DEFAULT_BREAKER_COOLDOWN_SEC,
+                 requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
         self.lang = lang
         self.current_client = None
         self.current_identifier = "N/A"
         self.cookies_file_template = 'cookies_gui_{username}.json'
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_cooldown_sec = breaker_cooldown_sec
+        self.requests_per_minute = requests_per_minute
+        self.request_budgets = {}
+        # Every session opened during the run stays in rotation until its breaker opens.
+        self.clients = {}
+        self.breakers = {}
+
+    def _register_client(self, client, identifier):
+        self.current_client = client
+        self.current_identifier = identifier
+        self.clients[identifier] = client
+        self.breakers[identifier] = CircuitBreaker(self.breaker_failure_threshold, self.breaker_cooldown_sec)
+
+    def breaker_for(self, identifier):
+        if identifier not in self.breakers:
+            self.breakers[identifier] = CircuitBreaker(self.breaker_failure_threshold, self.breaker_cooldown_sec)
+        return self.breakers[identifier]
+
+    def budget_for(self, identifier):
+        if identifier not in self.request_budgets:
+            self.request_budgets[identifier] = RequestBudget(self.requests_per_minute)
+        return self.request_budgets[identifier]
+
+    def select_client(self, exclude=None):
+        """Prefer a healthy client other than `exclude` (current one first); fall back to `exclude`."""
+        order = sorted(self.clients, key=lambda identifier: (identifier == exclude, identifier != self.current_identifier))
+        for identifier in order:
+            if self.breaker_for(identifier).allow():
+                self.current_client = self.clients[identifier]
+                self.current_identifier = identifier
+                return True
+        return False
+
+    def rotate(self):
+        """Switch to the next pooled client whose breaker allows requests, the current one last."""
+        identifiers = list(self.clients)
+        if self.current_identifier in identifiers:
+            start = identifiers.index(self.current_identifier) + 1
+            identifiers = identifiers[start:] + identifiers[:start]
+        for identifier in identifiers:
+            if self.breaker_for(identifier).allow():
+                self.current_client = self.clients[identifier]
+                self.current_identifier = identifier
+                return True
+        return False
+
+    def seconds_until_available(self):
+        """0 if some pooled client may be used now, else the shortest cooldown left; None if none will reopen."""
+        waits = []
+        for identifier in self.clients:
+            breaker = self.breaker_for(identifier)
+            if breaker.allow():
+                return 0
+            if breaker.open_until is not None:
+                waits.append(breaker.open_until - time.monotonic())
+        return max(0, min(waits)) if waits else None
 
     async def _login_attempt(self, client, username, email, password, cookie_file):
+        from twikit import TooManyRequests, TwitterException
+        from twikit.errors import BadRequest, Forbidden, Unauthorized, AccountLocked
+
         login_attempts = 0
         while login_attempts < DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT:
             login_attempts += 1
-            self.app_callbacks['log_message'](f"{username} için giriş deneniyor ({login_attempts}/{DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT})...", "INFO")
+            logger.info("%s için giriş deneniyor (%s/%s)...", username, login_attempts, DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT)
             try:
-                self.app_callbacks['log_message'](f"Eğer Twitter kod isterse, {email} adresine gelen kodu girin.", "USER_INPUT")
+                logger.log(USER_INPUT, "Eğer Twitter kod isterse, %s adresine gelen kodu girin.", email)
                 
                 auth_info_1 = username
                 auth_info_2 = email if email else username
@@ -91,39 +421,41 @@ class TwitterClientManager:
                     cookies_file=cookie_file,
                     enable_ui_metrics=True
                 )
-                self.app_callbacks['log_message'](f"{username} ile giriş yapıldı, {cookie_file} kaydedildi.", "OK")
+                logger.log(OK, "%s ile giriş yapıldı, %s kaydedildi.", username, cookie_file)
                 return client, username
             except (BadRequest, Forbidden, Unauthorized, AccountLocked) as e:
-                self.app_callbacks['log_message'](f"{username} login sırasında API/Hesap Hatası ({type(e).__name__} - {e}).", "ERROR")
+                logger.error("%s login sırasında API/Hesap Hatası (%s - %s).", username, type(e).__name__, e)
                 if login_attempts >= DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT:
                     raise ConnectionError(f"{username} ile max login denemesi sonrası başarısız: {e}")
                 wait_time = randint(DEFAULT_LOGIN_RETRY_DELAY_MIN * login_attempts, DEFAULT_LOGIN_RETRY_DELAY_MAX * login_attempts)
-                self.app_callbacks['log_message'](f"{wait_time} saniye sonra tekrar denenecek...", "INFO")
+                logger.info("%s saniye sonra tekrar denenecek...", wait_time)
                 await asyncio.sleep(wait_time)
             except TooManyRequests as e:
-                self.app_callbacks['log_message'](f"{username} login sırasında Rate Limit ({type(e).__name__} - {e}).", "ERROR")
+                logger.error("%s login sırasında Rate Limit (%s - %s).", username, type(e).__name__, e)
                 if login_attempts >= DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT:
                     raise ConnectionError(f"{username} ile max login denemesi sonrası rate limit: {e}")
                 wait_time = randint(DEFAULT_RATE_LIMIT_WAIT_SEC * login_attempts, (DEFAULT_RATE_LIMIT_WAIT_SEC + 10) * login_attempts)
-                self.app_callbacks['log_message'](f"Rate limit nedeniyle {wait_time} saniye sonra tekrar denenecek...", "INFO")
+                logger.info("Rate limit nedeniyle %s saniye sonra tekrar denenecek...", wait_time)
                 await asyncio.sleep(wait_time)
             except TwitterException as e_twitter:
-                self.app_callbacks['log_message'](f"Twitter login hatası ({username}): {e_twitter}.", "ERROR")
+                logger.error("Twitter login hatası (%s): %s.", username, e_twitter)
                 if login_attempts >= DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT:
                     raise ConnectionError(f"{username} ile max deneme sonrası Twitter login hatası: {e_twitter}")
                 wait_time = randint(DEFAULT_LOGIN_RETRY_DELAY_MIN * login_attempts, DEFAULT_LOGIN_RETRY_DELAY_MAX * login_attempts)
-                self.app_callbacks['log_message'](f"Twitter login hatası nedeniyle {wait_time} saniye sonra tekrar denenecek...", "INFO")
+                logger.info("Twitter login hatası nedeniyle %s saniye sonra tekrar denenecek...", wait_time)
                 await asyncio.sleep(wait_time)
             except Exception as e_general:
-                self.app_callbacks['log_message'](f"Genel login hatası ({username}): {e_general}.", "ERROR")
+                logger.error("Genel login hatası (%s): %s.", username, e_general)
                 if login_attempts >= DEFAULT_MAX_LOGIN_ATTEMPTS_PER_ACCOUNT:
                     raise ConnectionError(f"{username} ile max deneme sonrası genel login hatası: {e_general}")
                 wait_time = randint(DEFAULT_LOGIN_RETRY_DELAY_MIN, DEFAULT_LOGIN_RETRY_DELAY_MAX)
-                self.app_callbacks['log_message'](f"Genel login hatası nedeniyle {wait_time} saniye sonra tekrar denenecek...", "INFO")
+                logger.info("Genel login hatası nedeniyle %s saniye sonra tekrar denenecek...", wait_time)
                 await asyncio.sleep(wait_time)
         raise ConnectionError(f"{username} ile tüm giriş denemeleri başarısız.")
 
     async def ensure_session(self, username, email, password):
+        from twikit import Client
+
         new_client = Client(language=self.lang)
         user_to_log = username if username else "Yeni/Bilinmeyen Hesap"
         cookie_file = self.cookies_file_template.format(username=user_to_log.replace("@","").replace(".","_"))
@@ -137,40 +469,37 @@ class TwitterClientManager:
                 elif hasattr(new_client, 'user') and new_client.user and hasattr(new_client.user, 'username'):
                     client_username_to_return = new_client.user.username
 
-                self.app_callbacks['log_message'](f"{client_username_to_return} (cookie): {cookie_file} yüklendi. Oturum geçerli.", "OK")
-                self.current_client = new_client
-                self.current_identifier = client_username_to_return
+                logger.log(OK, "%s (cookie): %s yüklendi. Oturum geçerli.", client_username_to_return, cookie_file)
+                self._register_client(new_client, client_username_to_return)
                 return True
             except Exception as e:
-                self.app_callbacks['log_message'](f"{user_to_log} (cookie): {cookie_file} yüklenirken hata ({type(e).__name__}: {e}), yeniden login.", "WARN")
+                logger.warning("%s (cookie): %s yüklenirken hata (%s: %s), yeniden login.", user_to_log, cookie_file, type(e).__name__, e)
                 if os.path.exists(cookie_file):
                     try:
                         os.remove(cookie_file)
-                        self.app_callbacks['log_message'](f"Sorunlu {cookie_file} silindi.", "INFO")
+                        logger.info("Sorunlu %s silindi.", cookie_file)
                     except Exception as e_rem:
-                        self.app_callbacks['log_message'](f"Cookie ({cookie_file}) silinirken hata: {e_rem}", "ERROR")
+                        logger.error("Cookie (%s) silinirken hata: %s", cookie_file, e_rem)
         
         if username and password:
             try:
                 _, identifier = await self._login_attempt(new_client, username, email, password, cookie_file)
-                self.current_client = new_client
-                self.current_identifier = identifier
+                self._register_client(new_client, identifier)
                 return True
             except ConnectionError as e:
-                self.app_callbacks['log_message'](f"Login failed for {username}: {e}", "ERROR")
+                logger.error("Login failed for %s: %s", username, e)
                 self.current_client = None
                 self.current_identifier = "N/A"
                 return False
         
-        self.app_callbacks['log_message'](f"{user_to_log} için kullanıcı bilgisi sağlanmadı veya login başarısız. Guest moda denenecek.", "WARN")
+        logger.warning("%s için kullanıcı bilgisi sağlanmadı veya login başarısız. Guest moda denenecek.", user_to_log)
         try:
             await new_client.login_as_guest()
-            self.app_callbacks['log_message'](f"🕵️ {user_to_log} adına Guest moda geçildi.", "OK")
-            self.current_client = new_client
-            self.current_identifier = "GuestClient"
+            logger.log(OK, "🕵️ %s adına Guest moda geçildi.", user_to_log)
+            self._register_client(new_client, "GuestClient")
             return True
         except Exception as e_guest:
-            self.app_callbacks['log_message'](f"❌ {user_to_log} adına Guest moda da geçilemedi: {e_guest}", "ERROR")
+            logger.error("❌ %s adına Guest moda da geçilemedi: %s", user_to_log, e_guest)
             self.current_client = None
             self.current_identifier = "N/A"
             return False
@@ -178,87 +507,1489 @@ class TwitterClientManager:
     def get_client_details(self):
         return self.current_client, self.current_identifier
 
+def profile_from_user(user):
+    created_at = getattr(user, 'created_at', None)
+    try:
+        created_at = datetime.strptime(created_at, '%a %b %d %H:%M:%S %z %Y').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        pass
+    return {
+        'user_id': str(user.id),
+        'user_name': getattr(user, 'name', 'N/A'),
+        'screen_name': getattr(user, 'screen_name', None),
+        'followers_count': getattr(user, 'followers_count', None),
+        'verified': bool(getattr(user, 'verified', False) or getattr(user, 'is_blue_verified', False)),
+        'account_created_at': created_at,
+    }
+
+TWEET_DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%a %b %d %H:%M:%S %z %Y', '%Y-%m-%dT%H:%M:%S')
+
+def parse_tweet_date(value):
+    """Parse a tweet/export date into a naive UTC datetime, or None."""
+    if isinstance(value, datetime):
+        return value
+    for date_format in TWEET_DATE_FORMATS:
+        try:
+            dt_obj = datetime.strptime(str(value).split('.')[0], date_format)
+        except ValueError:
+            continue
+        if dt_obj.tzinfo is not None:
+            dt_obj = dt_obj.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt_obj
+    return None
+
+def tweet_data_from(t):
+    date_str = str(getattr(t, 'created_at', 'N/A'))
+    dt_obj = parse_tweet_date(getattr(t, 'created_at', None))
+    if dt_obj:
+        date_str = dt_obj.strftime('%Y-%m-%d %H:%M:%S')
+
+    tweet_data = {
+        'id': t.id,
+        'user_name': getattr(getattr(t, 'user', None), 'name', 'N/A'),
+        'date_str': date_str,
+        'text': getattr(t, 'text', '').replace('\n',' ').replace('\r',''),
+        'retweet_count': getattr(t, 'retweet_count', 0),
+        'favorite_count': getattr(t, 'favorite_count', 0)
+    }
+    if getattr(t, 'user', None) is not None:
+        tweet_data.update(profile_from_user(t.user))
+    else:
+        tweet_data['user_id'] = getattr(t, '_legacy', {}).get('user_id_str')
+    return tweet_data
+
+ENTITY_KINDS = ('hashtags', 'mentions', 'urls')
+ENTITY_PATTERNS = {
+    'hashtags': re.compile(r'(?<![\w&])[#＃](\w*[^\W\d]\w*)'),
+    'mentions': re.compile(r'(?<![\w@])[@＠](\w{1,15})'),
+    'urls': re.compile(r'https?://[^\s<>"]+'),
+}
+ENTITY_PREFIXES = {'hashtags': '#', 'mentions': '@', 'urls': ''}
+# unicode61 and str.lower() leave the dotless ı apart from i; text is folded before indexing and matching.
+I_FOLD = str.maketrans({'ı': 'i', 'İ': 'i'})
+
+def extract_entities(tweets):
+    """Hashtags, mentions and URLs for a page of tweets, one dict per tweet.
+
+    twikit's structured entities are used when the tweet carries them; the
+    rest are found with one pass of each regex over the joined texts.
+    """
+    from bisect import bisect_right
+
+    results, fallback = [], []
+    for t in tweets:
+        try:
+            note = t._note_tweet_results
+            entity_set = note['result'].get('entity_set', {}) if note else t._legacy['entities']
+            results.append({
+                'hashtags': list(t.hashtags),
+                'mentions': [mention['screen_name'] for mention in entity_set.get('user_mentions', [])],
+                'urls': [url.get('expanded_url') or url.get('url') for url in (t.urls or [])],
+            })
+        except (AttributeError, KeyError, TypeError):
+            results.append({kind: [] for kind in ENTITY_KINDS})
+            fallback.append(len(results) - 1)
+    if fallback:
+        texts = [getattr(tweets[index], 'text', None) or '' for index in fallback]
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        joined = "\n".join(texts)
+        for kind, pattern in ENTITY_PATTERNS.items():
+            for match in pattern.finditer(joined):
+                value = match.group(1) if pattern.groups else match.group(0).rstrip('.,;:!?)]}\'"')
+                results[fallback[bisect_right(starts, match.start()) - 1]][kind].append(value)
+    return results
+
+class EntityCounter:
+    """Running per-interval entity counts, updated page by page and emptied by flush()."""
+
+    SHEET_TITLE = 'Öne Çıkanlar'
+    SHEET_HEADER = ['Aralık Başı', 'Aralık Sonu', 'Tür', 'Sıra', 'Değer', 'Sayı']
+
+    def __init__(self, top_n=DEFAULT_ENTITY_TOP_N):
+        from collections import Counter
+
+        self.top_n = top_n
+        self.counts = {kind: Counter() for kind in ENTITY_KINDS}
+
+    def add(self, entities):
+        if not self.top_n:
+            return
+        for kind in ENTITY_KINDS:
+            values = entities.get(kind) or []
+            # Folded like the search text, so #İstanbul, #ISTANBUL and #istanbul count as one.
+            self.counts[kind].update(value if kind == 'urls' else value.translate(I_FOLD).lower() for value in values)
+
+    def merge(self, other):
+        for kind in ENTITY_KINDS:
+            self.counts[kind].update(other.counts[kind])
+
+    def merge_rows(self, rows):
+        """Fold sheet rows written by flush() back into the counts."""
+        for row in rows:
+            kind, value, count = row[2], row[4], row[5]
+            if kind in self.counts and value and count:
+                self.counts[kind][str(value)[len(ENTITY_PREFIXES[kind]):]] += count
+
+    def flush(self, since_dt, until_dt):
+        """Top-N sheet rows for the interval; the counters start over afterwards."""
+        since_str, until_str = f"{since_dt:%Y-%m-%d %H:%M:%S}", f"{until_dt:%Y-%m-%d %H:%M:%S}"
+        rows = []
+        for kind in ENTITY_KINDS:
+            for rank, (value, count) in enumerate(self.counts[kind].most_common(self.top_n), start=1):
+                rows.append((since_str, until_str, kind, rank, ENTITY_PREFIXES[kind] + value, count))
+            self.counts[kind].clear()
+        return rows
+
+class NearDuplicateIndex:
+    """Streaming MinHash/LSH over normalized tweet text.
+
+    Signatures use one-permutation hashing: each word bigram is hashed once
+    with Python's tuple hash (seeded per process, so clusters are stable
+    within a run), the hash picks one of bands*rows bins and the bin keeps
+    its minimum; an empty bin copies the first filled bin in its own fixed
+    probe order (optimal densification, which unlike copying a neighbour
+    keeps unrelated tweets that share one phrase apart). A tweet joins the
+    cluster of any recent tweet with an identical band, so the default 8
+    bands of 4 rows catch pairs above roughly 0.6 Jaccard similarity. Band
+    keys are kept in two generations of at most `capacity` tweets each, so
+    memory stays flat on long runs and clusters span recent tweets only.
+    """
+
+    MODES = ('off', 'tag', 'drop')
+    # URLs, mentions and "rt" match without a group and come back from findall() as ''.
+    TOKENS = re.compile(r'https?://\S+|[@＠]\w+|\brt\b|([^\W_]+)')
+    MIN_TOKENS = 4
+
+    def __init__(self, capacity=DEFAULT_NEAR_DUP_CAPACITY, bands=DEFAULT_MINHASH_BANDS, rows=DEFAULT_MINHASH_ROWS):
+        from random import Random
+
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = rows
+        self.bins = bands * rows
+        probe_random = Random(self.bins)
+        self.probes = [[j for j in probe_random.sample(range(self.bins), self.bins) if j != i] for i in range(self.bins)]
+        self.bin_ids = range(self.bins)
+        self.bin_set = frozenset(self.bin_ids)
+        self.current = {}
+        self.previous = {}
+        self.seen = 0
+        self.duplicates = 0
+
+    def normalize(self, text):
+        words = []
+        for token in (text or "").translate(I_FOLD).lower().split():
+            # Plain words skip the regex; it only splits tokens with punctuation, URLs or mentions.
+            if token.isalnum():
+                if token != 'rt':
+                    words.append(token)
+            else:
+                words.extend(filter(None, self.TOKENS.findall(token)))
+        return words
+
+    def band_keys(self, tokens):
+        bins = self.bins
+        hashes = sorted(map(hash, zip(tokens, tokens[1:])), reverse=True)
+        # In descending order the last write to a bin is its smallest hash.
+        minima = {}
+        for h in hashes:
+            minima[h % bins] = h // bins
+        signature = list(map(minima.get, self.bin_ids))
+        if len(minima) < bins:
+            filled, probes = minima.__contains__, self.probes
+            for i in self.bin_set.difference(minima):
+                signature[i] = minima[next(filter(filled, probes[i]))]
+        return list(map(hash, zip(range(self.bands), *[iter(signature)] * self.rows)))
+
+    def assign(self, tweet_id, text):
+        """Cluster ID for the tweet (its own ID when it starts a new cluster) and whether it is a near-duplicate."""
+        self.seen += 1
+        tokens = self.normalize(text)
+        if len(tokens) < self.MIN_TOKENS:
+            return str(tweet_id), False
+        keys = self.band_keys(tokens)
+        current = self.current
+        cluster_id = next(filter(None, map(current.get, keys)), None) or next(filter(None, map(self.previous.get, keys)), None)
+        is_duplicate = cluster_id is not None
+        if is_duplicate:
+            self.duplicates += 1
+        else:
+            cluster_id = str(tweet_id)
+        current.update(dict.fromkeys(keys, cluster_id))
+        if len(current) >= self.capacity * self.bands:
+            self.previous, self.current = current, {}
+        return cluster_id, is_duplicate
+
+class QuantileSketch:
+    """Log-bucketed histogram of non-negative values (DDSketch).
+
+    Value x > 0 lands in bucket ceil(log_gamma(x)), so quantiles come back
+    within `accuracy` relative error and a run with engagement up to 10^7
+    needs under a thousand buckets.
+    """
+
+    def __init__(self, accuracy=DEFAULT_QUANTILE_ACCURACY):
+        import math
+
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._log = math.log
+        self._ceil = math.ceil
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = self._ceil(self._log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return None
+
+class HeavyHitters:
+    """Misra-Gries frequent items with batched purges.
+
+    Up to 2*capacity counters are kept; when that fills, every counter drops
+    by the (capacity+1)-th largest count and the ones at zero go, so adds are
+    amortized O(log capacity). Reported counts are lower bounds that miss at
+    most `error` per item.
+    """
+
+    def __init__(self, capacity=DEFAULT_SUMMARY_USER_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = 0
+
+    def add(self, key, weight=1):
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + weight
+        if len(counts) > 2 * self.capacity:
+            from heapq import nlargest
+
+            cut = nlargest(self.capacity + 1, counts.values())[-1]
+            self.error += cut
+            self.counts = {k: count - cut for k, count in counts.items() if count > cut}
+
+    def merge(self, other):
+        for key, count in other.counts.items():
+            self.add(key, count)
+        self.error += other.error
+
+    def top(self, n):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+class IntervalSummary:
+    """Streaming aggregates of the tweets stored for one interval, emptied by flush().
+
+    Counts and engagement sums are exact; engagement (RT + likes) quantiles
+    come from a QuantileSketch and the most active authors from HeavyHitters,
+    so memory does not grow with the interval and reports can read one sheet
+    row per interval instead of the tweet rows.
+    """
+
+    SHEET_TITLE = 'Aralık Özeti'
+    SHEET_HEADER = ['Aralık Başı', 'Aralık Sonu', 'Tweet', 'Saatlik Tweet', 'RT Toplam', 'Beğeni Toplam',
+                    'Ort. Etkileşim', 'Etkileşim p50', 'Etkileşim p90', 'Etkileşim p99', 'Maks. Etkileşim',
+                    'En Aktif Kullanıcılar', 'Not']
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, top_users=DEFAULT_SUMMARY_TOP_USERS):
+        self.top_users = top_users
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.retweets = 0
+        self.favorites = 0
+        self.max_engagement = 0
+        self.engagement = QuantileSketch()
+        self.users = HeavyHitters(max(DEFAULT_SUMMARY_USER_CAPACITY, self.top_users * 10))
+
+    def add_many(self, tweets):
+        engagement, users = self.engagement, self.users
+        for t in tweets:
+            retweets, favorites = t.get('retweet_count') or 0, t.get('favorite_count') or 0
+            self.retweets += retweets
+            self.favorites += favorites
+            engagement.add(retweets + favorites)
+            if retweets + favorites > self.max_engagement:
+                self.max_engagement = retweets + favorites
+            if self.top_users:
+                user = ENTITY_PREFIXES['mentions'] + t['screen_name'] if t.get('screen_name') else t.get('user_id')
+                if user:
+                    users.add(user)
+        self.count += len(tweets)
+
+    def merge(self, other):
+        self.count += other.count
+        self.retweets += other.retweets
+        self.favorites += other.favorites
+        self.max_engagement = max(self.max_engagement, other.max_engagement)
+        self.engagement.merge(other.engagement)
+        self.users.merge(other.users)
+
+    def flush(self, since_dt, until_dt, note=None):
+        """Summary sheet row for the interval; the aggregates start over afterwards."""
+        hours = (until_dt - since_dt).total_seconds() / 3600
+        quantiles = [self.engagement.quantile(q) for q in self.QUANTILES]
+        row = (f"{since_dt:%Y-%m-%d %H:%M:%S}", f"{until_dt:%Y-%m-%d %H:%M:%S}", self.count,
+               round(self.count / hours, 2) if hours > 0 else None, self.retweets, self.favorites,
+               round((self.retweets + self.favorites) / self.count, 2) if self.count else None,
+               *(round(value) if value is not None else None for value in quantiles),
+               self.max_engagement if self.count else None,
+               ", ".join(f"{user} ({count})" for user, count in self.users.top(self.top_users)) or None, note)
+        self._reset()
+        return row
+
+class BackgroundWriter:
+    """Runs submitted disk writes in order on one daemon thread, so the event loop never waits on SQLite."""
+
+    def __init__(self, name):
+        import queue
+
+        self._queue = queue.Queue()
+        self.busy_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True, name=name)
+        self._thread.start()
+
+    def submit(self, func, *args):
+        self._queue.put((func, args))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            func, args = item
+            started = time.perf_counter()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error("Arka plan yazma hatası (%s): %s", getattr(func, '__qualname__', func), e)
+            self.busy_seconds += time.perf_counter() - started
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is written; False on timeout."""
+        done = threading.Event()
+        self.submit(done.set)
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        """Write what is queued, then stop the thread; False if it is still writing after `timeout`."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+class UserProfileCache:
+    """In-memory LRU of author profiles in front of a SQLite table keyed by user ID.
+
+    The table outlives the run, so authors seen in earlier intervals or runs
+    cost no requests until their entry is older than `max_age_hours`.
+    """
+
+    def __init__(self, path=DEFAULT_PROFILE_CACHE_FILE, max_entries=DEFAULT_PROFILE_CACHE_SIZE,
+                 max_age_hours=DEFAULT_PROFILE_CACHE_MAX_AGE_HOURS):
+        import sqlite3
+        from collections import OrderedDict
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_sec = max_age_hours * 3600
+        self._memory = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Writes may run on a BackgroundWriter thread; WAL lets them use their own connection beside reads.
+        self._write_conn = None
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS user_profiles (user_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def path_for(output_file):
+        return os.path.splitext(output_file)[0] + "_profiles.sqlite3"
+
+    def _remember(self, user_id, profile, updated_at):
+        self._memory[user_id] = (profile, updated_at)
+        self._memory.move_to_end(user_id)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, user_ids):
+        import json
+
+        now = time.time()
+        found, misses = {}, []
+        for user_id in user_ids:
+            cached = self._memory.get(user_id)
+            if cached and now - cached[1] < self.max_age_sec:
+                self._memory.move_to_end(user_id)
+                found[user_id] = cached[0]
+            else:
+                misses.append(user_id)
+        for start in range(0, len(misses), 500):
+            chunk = misses[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for user_id, data, updated_at in self._conn.execute(
+                    f"SELECT user_id, data, updated_at FROM user_profiles WHERE user_id IN ({placeholders})", chunk):
+                if now - updated_at < self.max_age_sec:
+                    profile = json.loads(data)
+                    self._remember(user_id, profile, updated_at)
+                    found[user_id] = profile
+        return found
+
+    def put_many(self, profiles, writer=None):
+        """Remember `profiles` at once; the SQLite write goes to `writer` (a BackgroundWriter) when given."""
+        if not profiles:
+            return
+        now = time.time()
+        for user_id, profile in profiles.items():
+            self._remember(user_id, profile, now)
+        entries = [(user_id, profile, now) for user_id, profile in profiles.items()]
+        if writer:
+            writer.submit(self._write, entries)
+        else:
+            self._write(entries)
+
+    def _write(self, entries):
+        import json
+        import sqlite3
+
+        if self._write_conn is None:
+            self._write_conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._write_conn.executemany("INSERT OR REPLACE INTO user_profiles (user_id, data, updated_at) VALUES (?, ?, ?)",
+                                     [(user_id, json.dumps(profile, ensure_ascii=False), updated_at) for user_id, profile, updated_at in entries])
+        self._write_conn.commit()
+
+    def close(self):
+        if self._write_conn is not None:
+            self._write_conn.close()
+        self._conn.close()
+
 class ExcelExporter:
-    def __init__(self, filename, app_callbacks):
+    HEADER = ['#', 'Kullanıcı', 'Tarih', 'Tweet', 'RT', 'Likes',
+              'Kullanıcı ID', 'Ekran Adı', 'Takipçi', 'Doğrulanmış', 'Hesap Tarihi', 'Tweet ID',
+              'Hashtagler', 'Bahsedilenler', 'URLler', 'Kopya Kümesi']
+
+    def __init__(self, filename, app_callbacks, autosave_rows=DEFAULT_AUTOSAVE_ROWS, autosave_sec=DEFAULT_AUTOSAVE_SEC,
+                 autosave_min_gap_factor=DEFAULT_AUTOSAVE_MIN_GAP_FACTOR):
         self.filename = filename
         self.app_callbacks = app_callbacks
-        self.workbook = None
-        self.worksheet = None
-        self.row_counter = 0
-        self._load_or_create_workbook()
+        self.autosave_rows = autosave_rows
+        self.autosave_sec = autosave_sec
+        self.autosave_min_gap_factor = autosave_min_gap_factor
+        # Rows are immutable tuples in lists that are only appended to (or
+        # swapped out whole), so a save snapshot is (list, row count) per sheet.
+        self.rows = []
+        self.sheets = {}
+        self._changes_since_save = 0
+        self._last_save_time = time.monotonic()
+        self._last_save_duration = 0.0
+        self.save_seconds = 0.0
+        self._save_cond = threading.Condition()
+        self._pending_snapshot = None
+        self._saving = False
+        self._save_thread = None
+        self._load_existing_rows()
+
+    def _load_existing_rows(self):
+        from openpyxl import load_workbook
 
-    def _load_or_create_workbook(self):
         try:
-            self.workbook = load_workbook(self.filename)
-            self.worksheet = self.workbook.active
-            if self.worksheet.max_row == 0 or (self.worksheet.max_row == 1 and self.worksheet.cell(row=1, column=1).value != '#'):
-                self.worksheet.delete_rows(1, self.worksheet.max_row) 
-                self._append_header()
-            self.row_counter = self.worksheet.max_row
-            if self.worksheet.cell(row=1, column=1).value != '#': 
-                 self._append_header()
-                 self.row_counter = 1
-
+            workbook = load_workbook(self.filename, read_only=True)
+            try:
+                worksheets = [[row for row in ws.iter_rows(values_only=True) if any(v is not None for v in row)]
+                              for ws in workbook.worksheets]
+                titles = workbook.sheetnames
+            finally:
+                workbook.close()
+            sheet_rows = worksheets[0] if worksheets else []
+            if sheet_rows and sheet_rows[0][0] == '#':
+                sheet_rows = sheet_rows[1:]
+            self.rows = [tuple(row) for row in sheet_rows]
+            for title, extra_rows in zip(titles[1:], worksheets[1:]):
+                if extra_rows:
+                    self.sheets[title] = {'header': list(extra_rows[0]), 'rows': [tuple(row) for row in extra_rows[1:]],
+                                          'loaded_intervals': {tuple(row[:2]) for row in extra_rows[1:]}}
         except FileNotFoundError:
-            self.workbook = Workbook()
-            self.worksheet = self.workbook.active
-            self._append_header()
-            self.row_counter = 1
+            self.rows = []
         except Exception as e:
-            self.app_callbacks['log_message'](f"Excel ({self.filename}) yüklenirken hata: {e}. Yeni dosya oluşturuluyor.", "ERROR")
-            self.workbook = Workbook()
-            self.worksheet = self.workbook.active
-            self._append_header()
-            self.row_counter = 1
-        self.app_callbacks['update_excel_tweets_count'](self.row_counter -1 if self.row_counter > 0 else 0)
-
-
-    def _append_header(self):
-        self.worksheet.append(['#', 'Kullanıcı', 'Tarih', 'Tweet', 'RT', 'Likes'])
+            logger.error("Excel (%s) yüklenirken hata: %s. Yeni dosya oluşturuluyor.", self.filename, e)
+            self.rows = []
+        self.app_callbacks['update_excel_tweets_count'](len(self.rows))
 
     def append_tweets(self, tweets_data):
-        if not self.worksheet:
-            return
         for t_data in tweets_data:
-            self.row_counter += 1
-            self.worksheet.append([
-                self.row_counter -1,
+            self.rows.append((
+                len(self.rows) + 1,
                 t_data.get('user_name', 'N/A'),
                 t_data.get('date_str', 'N/A'),
                 t_data.get('text', ''),
                 t_data.get('retweet_count', 0),
-                t_data.get('favorite_count', 0)
-            ])
-        self.app_callbacks['update_excel_tweets_count'](self.row_counter -1 if self.row_counter > 0 else 0)
-
+                t_data.get('favorite_count', 0),
+                t_data.get('user_id'),
+                t_data.get('screen_name'),
+                t_data.get('followers_count'),
+                t_data.get('verified'),
+                t_data.get('account_created_at'),
+                t_data.get('id'),
+                *(" ".join(ENTITY_PREFIXES[kind] + value for value in t_data[kind]) or None if t_data.get(kind) is not None else None
+                  for kind in ENTITY_KINDS),
+                t_data.get('dup_cluster'),
+            ))
+        self._changes_since_save += len(tweets_data)
+        self.app_callbacks['update_excel_tweets_count'](len(self.rows))
+        self._maybe_autosave()
+
+    def update_row(self, index, changes):
+        """Replace row `index` with a copy that has `changes` ({column index: value}) applied."""
+        row = list(self.rows[index])
+        row.extend([None] * (len(self.HEADER) - len(row)))
+        for column, value in changes.items():
+            row[column] = value
+        self.rows[index] = tuple(row)
+        self._changes_since_save += 1
+        self._maybe_autosave()
+
+    def register_sheet(self, title, header):
+        """Add a side sheet written after the main one; rows loaded from an existing file are kept."""
+        if title not in self.sheets:
+            self.sheets[title] = {'header': list(header), 'rows': [], 'loaded_intervals': set()}
+        elif list(header)[:len(self.sheets[title]['header'])] == self.sheets[title]['header']:
+            # A file written before columns were added gets the new header.
+            self.sheets[title]['header'] = list(header)
+
+    def append_sheet_rows(self, title, rows):
+        self.sheets[title]['rows'].extend(tuple(row) for row in rows)
+
+    def interval_rows(self, title, interval):
+        return [row for row in self.sheets[title]['rows'] if tuple(row[:2]) == interval]
+
+    def replace_interval_rows(self, title, interval, rows):
+        """Put `rows` where the rows of `interval` (its first two cells) were, or at the end."""
+        sheet = self.sheets[title]
+        old = sheet['rows']
+        index = next((i for i, row in enumerate(old) if tuple(row[:2]) == interval), len(old))
+        kept = [row for row in old if tuple(row[:2]) != interval]
+        # A new list, so a save snapshot taken from the old one stays consistent.
+        sheet['rows'] = kept[:index] + [tuple(row) for row in rows] + kept[index:]
+
+    def _maybe_autosave(self):
+        changes = self._changes_since_save
+        if changes <= 0:
+            return
+        since_save = time.monotonic() - self._last_save_time
+        # A save takes longer as the file grows, so autosaves space out with it instead of every N rows.
+        if since_save < self.autosave_min_gap_factor * self._last_save_duration:
+            return
+        if (self.autosave_rows and changes >= self.autosave_rows) or \
+                (self.autosave_sec and since_save >= self.autosave_sec):
+            logger.debug("Otomatik kayıt (%s değişen satır, son kayıt %.1fs).", changes, self._last_save_duration)
+            self.save_workbook()
 
     def save_workbook(self):
-        if not self.workbook:
-            return False
+        """Queue a background save of the current rows and return immediately."""
+        with self._save_cond:
+            self._pending_snapshot = [(None, self.HEADER, self.rows, len(self.rows))] + \
+                [(title, sheet['header'], sheet['rows'], len(sheet['rows'])) for title, sheet in list(self.sheets.items())]
+            self._changes_since_save = 0
+            self._last_save_time = time.monotonic()
+            if self._save_thread is None:
+                self._save_thread = threading.Thread(target=self._save_worker, daemon=True, name="excel-save")
+                self._save_thread.start()
+            self._save_cond.notify_all()
+        return True
+
+    def wait_for_saves(self, timeout=None):
+        with self._save_cond:
+            return self._save_cond.wait_for(lambda: self._pending_snapshot is None and not self._saving, timeout)
+
+    def _save_worker(self):
+        while True:
+            with self._save_cond:
+                self._save_cond.wait_for(lambda: self._pending_snapshot is not None)
+                snapshot = self._pending_snapshot
+                self._pending_snapshot = None
+                self._saving = True
+            started = time.perf_counter()
+            try:
+                self._write_snapshot(snapshot)
+            finally:
+                self._last_save_duration = time.perf_counter() - started
+                self.save_seconds += self._last_save_duration
+                with self._save_cond:
+                    self._saving = False
+                    self._save_cond.notify_all()
+
+    def _write_snapshot(self, snapshot):
+        import tempfile
+        from openpyxl import Workbook
+
+        target_dir = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_path = tempfile.mkstemp(prefix=".~" + os.path.basename(self.filename), suffix=".tmp", dir=target_dir)
+        os.close(fd)
         try:
-            self.workbook.save(self.filename)
-            self.app_callbacks['log_message'](f"Excel dosyası '{self.filename}' kaydedildi.", "OK")
-            return True
-        except PermissionError:
-            new_filename = self.filename.replace(".xlsx", f"_locked_{datetime.now():%H%M%S}.xlsx")
+            workbook = Workbook(write_only=True)
+            for title, header, rows, row_count in snapshot:
+                worksheet = workbook.create_sheet(title)
+                worksheet.append(header)
+                for row in rows[:row_count]:
+                    worksheet.append(row)
+            workbook.save(tmp_path)
+            row_count = snapshot[0][3]
             try:
-                self.workbook.save(new_filename)
-                self.app_callbacks['log_message'](f"'{self.filename}' kilitli. '{new_filename}' olarak kaydedildi.", "ERROR")
-                self.filename = new_filename 
-                return True
-            except Exception as e_new:
-                self.app_callbacks['log_message'](f"Excel'i yeni isimle ({new_filename}) kaydetme hatası: {e_new}", "ERROR")
-                return False
+                os.replace(tmp_path, self.filename)
+                logger.log(OK, "Excel dosyası '%s' kaydedildi (%s satır).", self.filename, row_count)
+            except PermissionError:
+                new_filename = self.filename.replace(".xlsx", f"_locked_{datetime.now():%H%M%S}.xlsx")
+                os.replace(tmp_path, new_filename)
+                logger.error("'%s' kilitli. '%s' olarak kaydedildi.", self.filename, new_filename)
+                self.filename = new_filename
         except Exception as e:
-            self.app_callbacks['log_message'](f"Excel kaydetme hatası: {e}", "ERROR")
-            return False
+            logger.error("Excel kaydetme hatası: %s", e)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+class TweetStore:
+    """Optional SQLite copy of the exported tweets for searching and browsing.
+
+    Text is indexed in a contentless FTS5 table keyed by the tweet row id,
+    with dotted/dotless i folded together so "YARDIM" finds "yardım"; date,
+    user and engagement have ordinary indexes so every browse order can be
+    paged by keyset instead of OFFSET. Without FTS5 text search falls back to
+    LIKE.
+    """
+
+    ROW_KEYS = ('#', 'user_name', 'date_str', 'text', 'retweet_count', 'favorite_count',
+                'user_id', 'screen_name', 'followers_count', 'verified', 'account_created_at', 'id') + ENTITY_KINDS
+    ORDERS = {'date': "t.date", 'engagement': "(t.retweet_count + t.favorite_count)"}
+
+    def __init__(self, path):
+        import sqlite3
+
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tweets (
+                id INTEGER PRIMARY KEY, tweet_id TEXT NOT NULL UNIQUE, user_name TEXT, screen_name TEXT, user_id TEXT,
+                date TEXT, text TEXT, retweet_count INTEGER, favorite_count INTEGER, followers_count INTEGER, verified INTEGER);
+            CREATE INDEX IF NOT EXISTS idx_tweets_date ON tweets (date);
+            CREATE INDEX IF NOT EXISTS idx_tweets_screen_name ON tweets (screen_name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_tweets_engagement ON tweets ((retweet_count + favorite_count));
+            CREATE TABLE IF NOT EXISTS entities (tweet_row INTEGER NOT NULL REFERENCES tweets (id), kind TEXT NOT NULL, value TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_entities_value ON entities (kind, value COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_entities_tweet ON entities (tweet_row);
+        """)
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5("
+                               "text, content='', tokenize='unicode61 remove_diacritics 2')")
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 desteği yok (%s); metin araması LIKE ile yapılacak.", e)
+            self.has_fts = False
+        self._conn.commit()
+
+    @staticmethod
+    def path_for(output_file):
+        return os.path.splitext(output_file)[0] + "_tweets.sqlite3"
+
+    @staticmethod
+    def _entity_values(value, kind):
+        if isinstance(value, str):
+            prefix = ENTITY_PREFIXES[kind]
+            return [part[len(prefix):] if prefix and part.startswith(prefix) else part for part in value.split()]
+        return list(value or [])
+
+    def add_many(self, tweets_data):
+        """Insert tweet_data dicts in one transaction; known tweets only get their engagement updated."""
+        records, entities = {}, {}
+        for t in tweets_data:
+            if t.get('id'):
+                entities[str(t['id'])] = [(kind, value) for kind in ENTITY_KINDS for value in self._entity_values(t.get(kind), kind)]
+                records[str(t['id'])] = (str(t['id']), t.get('user_name'), t.get('screen_name'), t.get('user_id'), t.get('date_str'),
+                                         t.get('text'), t.get('retweet_count'), t.get('favorite_count'), t.get('followers_count'),
+                                         None if t.get('verified') is None else int(bool(t.get('verified'))))
+        if not records:
+            return 0
+        with self._conn:
+            existing = set()
+            ids = list(records)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                existing.update(row[0] for row in self._conn.execute(
+                    f"SELECT tweet_id FROM tweets WHERE tweet_id IN ({','.join('?' * len(chunk))})", chunk))
+            new_ids = [tweet_id for tweet_id in ids if tweet_id not in existing]
+            self._conn.executemany("INSERT INTO tweets (tweet_id, user_name, screen_name, user_id, date, text, retweet_count, "
+                                   "favorite_count, followers_count, verified) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   [records[tweet_id] for tweet_id in new_ids])
+            self._conn.executemany("UPDATE tweets SET retweet_count = ?, favorite_count = ? WHERE tweet_id = ?",
+                                   [(records[tweet_id][6], records[tweet_id][7], tweet_id) for tweet_id in existing])
+            for start in range(0, len(new_ids), 500):
+                chunk = new_ids[start:start + 500]
+                inserted = self._conn.execute(f"SELECT id, tweet_id, text FROM tweets WHERE tweet_id IN ({','.join('?' * len(chunk))})",
+                                              chunk).fetchall()
+                self._conn.executemany("INSERT INTO entities (tweet_row, kind, value) VALUES (?, ?, ?)",
+                                       [(row_id, kind, value) for row_id, tweet_id, _ in inserted for kind, value in entities[tweet_id]])
+                if self.has_fts:
+                    self._conn.executemany("INSERT INTO tweets_fts (rowid, text) VALUES (?, ?)",
+                                           [(row_id, (text or "").translate(I_FOLD)) for row_id, _, text in inserted])
+        return len(new_ids)
+
+    def add_rows(self, rows, batch_size=10000):
+        """Import workbook rows (ExcelExporter.HEADER layout); rows without a Tweet ID are skipped."""
+        added = 0
+        for start in range(0, len(rows), batch_size):
+            added += self.add_many([dict(zip(self.ROW_KEYS, row)) for row in rows[start:start + batch_size]])
+        return added
+
+    def update_engagement(self, updates):
+        """`updates` is a list of (tweet_id, retweet_count, favorite_count)."""
+        with self._conn:
+            self._conn.executemany("UPDATE tweets SET retweet_count = ?, favorite_count = ? WHERE tweet_id = ?",
+                                   [(rt, likes, str(tweet_id)) for tweet_id, rt, likes in updates])
+
+    @staticmethod
+    def fts_query(text):
+        """Quote each word so user input can never be an FTS syntax error; keep OR and trailing-* prefixes."""
+        terms = []
+        for word in text.translate(I_FOLD).split():
+            if word == 'OR':
+                terms.append(word)
+            elif word.endswith('*') and len(word) > 1:
+                terms.append('"' + word[:-1].replace('"', '""') + '"*')
+            else:
+                terms.append('"' + word.replace('"', '""') + '"')
+        return " ".join(terms)
+
+    def search(self, text=None, user=None, date_from=None, date_to=None, order='date', after=None, limit=DEFAULT_SEARCH_PAGE_ROWS):
+        """One page of matches plus the cursor of the next page (None on the last page).
+
+        'date' and 'engagement' pages are newest/highest first and keyed on
+        (sort value, id); 'relevance' needs a text query and pages by offset.
+        """
+        clauses, params = [], []
+        source = "tweets t"
+        if text and text.strip():
+            if self.has_fts:
+                source = "tweets_fts JOIN tweets t ON t.id = tweets_fts.rowid"
+                clauses.append("tweets_fts MATCH ?")
+                params.append(self.fts_query(text))
+            else:
+                for word in text.split():
+                    clauses.append("t.text LIKE ?")
+                    params.append(f"%{word.strip('*')}%")
+        elif order == 'relevance':
+            order = 'date'
+        if order == 'relevance' and not self.has_fts:
+            order = 'date'
+        if user and user.strip():
+            clauses.append("t.screen_name = ? COLLATE NOCASE")
+            params.append(user.strip().lstrip('@'))
+        if date_from:
+            clauses.append("t.date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("t.date <= ?")
+            params.append(date_to + " 23:59:59" if len(date_to) == 10 else date_to)
+
+        if order == 'relevance':
+            sort_expr, order_by = "tweets_fts.rank", "tweets_fts.rank"
+            offset = after or 0
+        else:
+            sort_expr = self.ORDERS[order]
+            order_by = f"{sort_expr} DESC, t.id DESC"
+            offset = 0
+            if after is not None:
+                clauses.append(f"({sort_expr}, t.id) < (?, ?)")
+                params.extend(after)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT t.id, t.date, t.screen_name, t.user_name, t.retweet_count, t.favorite_count, t.text, t.tweet_id, {sort_expr} "
+            f"FROM {source}{where} ORDER BY {order_by} LIMIT ? OFFSET ?", params + [limit + 1, offset]).fetchall()
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = offset + limit if order == 'relevance' else (rows[-1][8], rows[-1][0])
+        return [row[:8] for row in rows], next_after
+
+    def count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+class FailedPageLedger:
+    """Persistent dead-letter log of abandoned pages (interval + max_id cursor + query).
+
+    Stored as append-only JSON lines next to the output file; the last line
+    for an entry id wins, so status updates never rewrite the file.
+    """
+
+    def __init__(self, output_file, max_attempts=DEFAULT_BACKFILL_MAX_ATTEMPTS):
+        self.path = os.path.splitext(output_file)[0] + "_failed_pages.jsonl"
+        self.max_attempts = max_attempts
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        import json
+
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.entries[entry['id']] = entry
+
+    def _write(self, entry):
+        import json
+
+        self.entries[entry['id']] = entry
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def query_key(query):
+        return "|".join(str(query.get(k, '')) for k in ('keywords', 'lang', 'product'))
+
+    def record(self, since_dt, until_dt, max_id, page_num, error, client_identifier, query, collected=0):
+        since_str = since_dt.strftime('%Y-%m-%d %H:%M:%S') if isinstance(since_dt, datetime) else str(since_dt)
+        until_str = until_dt.strftime('%Y-%m-%d %H:%M:%S') if isinstance(until_dt, datetime) else str(until_dt)
+        entry_id = f"{since_str}|{until_str}|{max_id or ''}|{self.query_key(query)}"
+        previous = self.entries.get(entry_id, {})
+        entry = {
+            'id': entry_id,
+            'since': since_str,
+            'until': until_str,
+            'max_id': max_id,
+            'page_num': page_num,
+            'collected': collected,
+            'query': query,
+            'error': error,
+            'client': client_identifier,
+            'attempts': previous.get('attempts', 0),
+            'status': 'pending',
+            'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self._write(entry)
+        return entry
+
+    def pending(self, query=None):
+        """Pending entries; with ``query``, only those recorded for the same keywords/lang/product."""
+        entries = [entry for entry in self.entries.values() if entry['status'] == 'pending']
+        if query is None:
+            return entries
+        key = self.query_key(query)
+        return [entry for entry in entries if 'query' in entry and self.query_key(entry['query']) == key]
+
+    def has_pending(self, since_str, until_str, query):
+        return any(entry['since'] == since_str and entry['until'] == until_str for entry in self.pending(query))
+
+    def mark_recovered(self, entry, tweet_count, client_identifier):
+        self._write(dict(entry, status='recovered', recovered_tweets=tweet_count, client=client_identifier,
+                         attempts=entry['attempts'] + 1, recorded_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+    def mark_failed(self, entry, error, client_identifier, max_id=None, page_num=None, collected=None):
+        attempts = entry['attempts'] + 1
+        status = 'unrecoverable' if attempts >= self.max_attempts else 'pending'
+        self._write(dict(entry, status=status, error=error, client=client_identifier, max_id=max_id or entry['max_id'],
+                         page_num=entry.get('page_num', 0) if page_num is None else page_num,
+                         collected=entry.get('collected', 0) if collected is None else collected,
+                         attempts=attempts, recorded_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+    def summary(self):
+        by_status = {'recovered': [], 'unrecoverable': [], 'pending': []}
+        for entry in self.entries.values():
+            by_status[entry['status']].append(entry)
+        return by_status['recovered'], by_status['unrecoverable'], by_status['pending']
+
+class WorkQueue:
+    """Date-range work units shared by worker processes through one SQLite file.
+
+    A worker claims a unit under a lease and keeps it alive with heartbeats;
+    a unit whose lease ran out (crashed or stalled worker) goes back to
+    whoever claims next, until it has been claimed `max_attempts` times.
+    Rollback journal instead of WAL, because WAL does not work when the file
+    sits on a filesystem shared between hosts.
+    """
+
+    def __init__(self, path):
+        import sqlite3
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS work_units (id INTEGER PRIMARY KEY, since TEXT NOT NULL, until TEXT NOT NULL, "
+                           "status TEXT NOT NULL DEFAULT 'pending', worker TEXT, lease_expires REAL, heartbeat_at REAL, "
+                           "attempts INTEGER NOT NULL DEFAULT 0, tweet_count INTEGER, error TEXT, UNIQUE (since, until))")
+
+    @property
+    def parts_dir(self):
+        """Directory next to the queue file where each worker writes its own partial output."""
+        return os.path.splitext(self.path)[0] + "_parts"
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def create(self, query_params, unit_hours=DEFAULT_QUEUE_UNIT_HOURS):
+        """Split start_dt..end_dt into units and store the query every worker will run; returns units added."""
+        import json
+
+        start_dt = datetime.strptime(query_params.get('start_dt', DEFAULT_START_DT_STR), '%Y-%m-%d %H:%M:%S')
+        end_dt = datetime.strptime(query_params.get('end_dt', DEFAULT_END_DT_STR), '%Y-%m-%d %H:%M:%S')
+        units = []
+        current_dt = start_dt
+        while current_dt < end_dt:
+            until_dt = min(current_dt + timedelta(hours=unit_hours), end_dt)
+            units.append((current_dt.strftime('%Y-%m-%d %H:%M:%S'), until_dt.strftime('%Y-%m-%d %H:%M:%S')))
+            current_dt = until_dt
+
+        def work(conn):
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('query_params', ?)",
+                         (json.dumps(query_params, ensure_ascii=False),))
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO work_units (since, until) VALUES (?, ?)", units)
+            return conn.total_changes - before
+        return self._transaction(work)
+
+    def query_params(self):
+        import json
+
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'query_params'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def claim(self, worker_id, lease_sec=DEFAULT_QUEUE_LEASE_SEC, max_attempts=DEFAULT_QUEUE_MAX_ATTEMPTS):
+        """Lease the oldest pending (or expired) unit to `worker_id`; None when nothing is claimable."""
+        def work(conn):
+            now = time.time()
+            conn.execute("UPDATE work_units SET status = 'failed', worker = NULL, error = 'lease süresi doldu' "
+                         "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?", (now, max_attempts))
+            row = conn.execute("SELECT id, since, until, attempts FROM work_units "
+                               "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                               "ORDER BY since LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE work_units SET status = 'leased', worker = ?, lease_expires = ?, heartbeat_at = ?, "
+                         "attempts = attempts + 1 WHERE id = ?", (worker_id, now + lease_sec, now, row[0]))
+            return {'id': row[0], 'since': row[1], 'until': row[2], 'attempts': row[3] + 1}
+        return self._transaction(work)
+
+    def heartbeat(self, unit_id, worker_id, lease_sec=DEFAULT_QUEUE_LEASE_SEC):
+        """Extend the lease; False means the unit was taken over and the worker should drop it."""
+        def work(conn):
+            now = time.time()
+            return conn.execute("UPDATE work_units SET lease_expires = ?, heartbeat_at = ? "
+                                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                                (now + lease_sec, now, unit_id, worker_id)).rowcount == 1
+        return self._transaction(work)
+
+    def complete(self, unit_id, worker_id, tweet_count):
+        def work(conn):
+            return conn.execute("UPDATE work_units SET status = 'done', lease_expires = NULL, tweet_count = ?, error = NULL "
+                                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                                (tweet_count, unit_id, worker_id)).rowcount == 1
+        return self._transaction(work)
+
+    def release(self, unit_id, worker_id, error=None):
+        """Hand a unit back untouched by this attempt (worker stopping or out of accounts)."""
+        def work(conn):
+            conn.execute("UPDATE work_units SET status = 'pending', worker = NULL, lease_expires = NULL, "
+                         "attempts = MAX(attempts - 1, 0), error = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                         (error, unit_id, worker_id))
+        self._transaction(work)
+
+    def summary(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM work_units GROUP BY status").fetchall())
+
+    def failed_units(self):
+        with self._lock:
+            return self._conn.execute("SELECT since, until, attempts, error FROM work_units WHERE status = 'failed' ORDER BY since").fetchall()
+
+    def close(self):
+        self._conn.close()
+
+class ConversationExpander:
+    """Fetches replies of high-engagement tweets on a bounded pool of loop tasks.
+
+    offer() never blocks: when the queue is full the tweet is skipped and
+    counted. Requests go through the scraper's `request` (budget, retries,
+    breaker) and keep half of the account's RequestBudget in reserve for the
+    main search; a tweet whose account failed is queued again, after the
+    cooldown, up to `max_attempts` times.
+    """
+
+    SHEET_TITLE = 'Yanıtlar'
+    SHEET_HEADER = ['Ana Tweet ID', 'Yanıt ID', 'Kullanıcı', 'Ekran Adı', 'Tarih', 'Tweet', 'RT', 'Likes']
+
+    def __init__(self, client_manager, exporter, request, min_retweets=0, min_faves=0, workers=DEFAULT_EXPAND_WORKERS,
+                 queue_size=DEFAULT_EXPAND_QUEUE_SIZE, max_replies=DEFAULT_EXPAND_MAX_REPLIES,
+                 max_attempts=DEFAULT_EXPAND_MAX_ATTEMPTS):
+        self.client_manager = client_manager
+        self.exporter = exporter
+        self.request = request
+        self.min_retweets = min_retweets
+        self.min_faves = min_faves
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.max_replies = max_replies
+        self.max_attempts = max_attempts
+        self.queue = None
+        self.workers = []
+        self.seen_ids = set()
+        self.pending_ids = set()
+        self.attempts = {}
+        self.dropped = 0
+        self.failed = 0
+        self.unavailable = 0
+        self.expanded = 0
+        self.exporter.register_sheet(self.SHEET_TITLE, self.SHEET_HEADER)
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    def qualifies(self, tweet_data):
+        return bool((self.min_retweets and (tweet_data.get('retweet_count') or 0) >= self.min_retweets) or
+                    (self.min_faves and (tweet_data.get('favorite_count') or 0) >= self.min_faves))
+
+    def offer(self, tweet_data):
+        tweet_id = tweet_data['id']
+        if self.queue is None or not self.qualifies(tweet_data) or tweet_id in self.seen_ids or tweet_id in self.pending_ids:
+            return
+        try:
+            self.queue.put_nowait(tweet_id)
+            self.pending_ids.add(tweet_id)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def drain(self):
+        if self.queue is not None:
+            await self.queue.join()
+
+    async def stop(self):
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        if self.expanded or self.dropped or self.failed or self.unavailable:
+            logger.info("Konuşma genişletme: %d tweet genişletildi, %d kuyruk dolu olduğu için atlandı, %d alınamadı, %d erişilemez.",
+                        self.expanded, self.dropped, self.failed, self.unavailable)
+
+    async def _worker(self):
+        while True:
+            tweet_id = await self.queue.get()
+            try:
+                await self._expand(tweet_id)
+                self.seen_ids.add(tweet_id)
+                self.pending_ids.discard(tweet_id)
+                self.attempts.pop(tweet_id, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._retry_later(tweet_id, e)
+            finally:
+                self.queue.task_done()
+
+    async def _retry_later(self, tweet_id, error):
+        attempts = self.attempts.get(tweet_id, 0) + 1
+        wait_sec = self.client_manager.seconds_until_available()
+        if attempts < self.max_attempts and wait_sec is not None and isinstance(error, (TemporaryClientError, PageFetchAbandoned)) \
+                and not isinstance(error, ResourceUnavailable):
+            self.attempts[tweet_id] = attempts
+            logger.debug("%s konuşması yeniden denenecek (%s).", tweet_id, error)
+            if wait_sec:
+                await asyncio.sleep(wait_sec)
+            try:
+                self.queue.put_nowait(tweet_id)
+                return
+            except asyncio.QueueFull:
+                self.dropped += 1
+        else:
+            self.failed += 1
+            logger.warning("%s konuşması alınamadı (%s: %s).", tweet_id, type(error).__name__, error)
+        self.pending_ids.discard(tweet_id)
+        self.attempts.pop(tweet_id, None)
+
+    async def _expand(self, tweet_id):
+        client, identifier = self.client_manager.get_client_details()
+        if not client or not self.client_manager.breaker_for(identifier).allow():
+            raise TemporaryClientError("Client devresi açık, rotasyon dışı.", identifier)
+        reserve = self.client_manager.budget_for(identifier).capacity * DEFAULT_EXPAND_BUDGET_RESERVE
+        log_fields = log_context(identifier)
+        try:
+            tweet = await self.request(lambda: client.get_tweet_by_id(tweet_id), identifier, log_fields, "get_tweet_by_id", reserve=reserve)
+        except ResourceUnavailable as e:
+            # Deleted or protected since it was collected: nothing to expand, and nothing to retry.
+            self.unavailable += 1
+            logger.debug("%s erişilemez (%s); yanıtlar atlandı.", tweet_id, e, extra=log_fields)
+            return
+        replies = tweet.replies
+        reply_rows = []
+        while replies is not None and len(reply_rows) < self.max_replies:
+            for reply in replies:
+                reply_data = tweet_data_from(reply)
+                reply_rows.append((tweet_id, reply_data['id'], reply_data['user_name'], reply_data.get('screen_name'),
+                                   reply_data['date_str'], reply_data['text'], reply_data['retweet_count'], reply_data['favorite_count']))
+            if not replies.next_cursor or len(replies) == 0 or len(reply_rows) >= self.max_replies:
+                break
+            replies = await self.request(replies.next, identifier, log_fields, "replies.next", reserve=reserve)
+        if reply_rows:
+            self.exporter.append_sheet_rows(self.SHEET_TITLE, reply_rows[:self.max_replies])
+        self.expanded += 1
+        logger.debug("%s için %d yanıt alındı.", tweet_id, len(reply_rows), extra=log_fields)
+
+class IntervalProfiler:
+    """Opt-in cProfile + tracemalloc sampling around each interval.
+
+    When disabled, start()/stop() return after a single attribute check.
+    Reports are written to '<excel dosyası>_profile/' next to the output.
+    cProfile only sees the event loop thread, so threads registered with
+    watch_thread() (Excel saves, store writes) get their busy time per
+    interval in a separate '_threads.txt' report.
+    """
+
+    def __init__(self, output_file, enabled=False, top_n=DEFAULT_PROFILE_TOP_N):
+        self.output_dir = os.path.splitext(output_file)[0] + "_profile"
+        self.enabled = enabled
+        self.top_n = top_n
+        self._profile = None
+        self._label = None
+        self._snapshot_before = None
+        self._tracing = False
+        self._threads = {}
+        self._thread_busy_before = {}
+
+    def watch_thread(self, name, busy_seconds):
+        """Report the growth of `busy_seconds()` (work done on thread `name`) for each interval."""
+        self._threads[name] = busy_seconds
+
+    def set_enabled(self, enabled):
+        # Takes effect at the next interval; the running one finishes as started.
+        self.enabled = bool(enabled)
+
+    def start(self, label):
+        if not self.enabled:
+            if self._tracing:
+                self._stop_tracing()
+            return
+        import cProfile
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(DEFAULT_PROFILE_TRACEMALLOC_FRAMES)
+            self._tracing = True
+        self._label = label
+        self._thread_busy_before = {name: busy_seconds() for name, busy_seconds in self._threads.items()}
+        self._snapshot_before = tracemalloc.take_snapshot()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        if self._profile is None:
+            return
+        import tracemalloc
+
+        self._profile.disable()
+        profile, self._profile = self._profile, None
+        snapshot_after = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base_path = os.path.join(self.output_dir, f"interval_{self._label}")
+            profile.dump_stats(base_path + ".pstats")
+            self._write_thread_report(base_path + "_threads.txt")
+            if snapshot_after is not None:
+                self._write_allocation_report(base_path + "_alloc.txt", snapshot_after)
+            logger.debug("Profil raporu yazıldı: %s.pstats", base_path)
+        except Exception as e:
+            logger.warning("Profil raporu yazılamadı: %s", e)
+        finally:
+            self._snapshot_before = None
+            if not self.enabled and self._tracing:
+                self._stop_tracing()
+
+    def _stop_tracing(self):
+        import tracemalloc
+
+        tracemalloc.stop()
+        self._tracing = False
+
+    def _write_thread_report(self, path):
+        lines = [f"Aralık {self._label} - .pstats yalnızca olay döngüsü thread'ini içerir; diğer thread'lerin meşgul süresi:"]
+        for name, busy_seconds in self._threads.items():
+            lines.append(f"{name}: {busy_seconds() - self._thread_busy_before.get(name, 0.0):.3f} s")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _write_allocation_report(self, path, snapshot_after):
+        filters = self._noise_filters()
+        snapshot_after = snapshot_after.filter_traces(filters)
+        lines = [f"Aralık {self._label} - en çok bellek ayıran {self.top_n} satır", "", "# Aralık boyunca fark"]
+        if self._snapshot_before is not None:
+            diff = snapshot_after.compare_to(self._snapshot_before.filter_traces(filters), 'lineno')
+            lines.extend(str(stat) for stat in diff[:self.top_n])
+        lines.extend(["", "# Aralık sonunda toplam"])
+        lines.extend(str(stat) for stat in snapshot_after.statistics('lineno')[:self.top_n])
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    @staticmethod
+    def _noise_filters():
+        import tracemalloc
+
+        return [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+
+class RequestPlanner:
+    """Splits a search-page budget over the date range before and during a run.
+
+    'even' gives every interval the same number of pages. 'stratified' uses
+    one-hour strata: a first pass spends `min_pages` on every hour, then the
+    remaining budget goes to the hours whose first pages were densest, each
+    capped at the pages it still seems to need. The throughput model covers
+    search pages only; it assumes accounts are used one after another (the
+    GUI loop rotates through the pool), so extra accounts raise the rate
+    limit but not the page delay.
+    """
+
+    MODES = ('off', 'even', 'stratified')
+
+    def __init__(self, start_dt, end_dt, budget_pages, mode='even', deadline=None, accounts=1, interval_hours=DEFAULT_INTERVAL_HOURS,
+                 min_pages=DEFAULT_PLAN_MIN_PAGES, page_size=DEFAULT_SEARCH_PAGE_SIZE, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 page_delay_sec=DEFAULT_PAGE_REQUEST_DELAY_SEC, interval_delay_sec=DEFAULT_REQUEST_DELAY_SEC,
+                 page_latency_sec=DEFAULT_PLAN_PAGE_LATENCY_SEC):
+        if mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen planlama modu: {mode}")
+        self.start_dt, self.end_dt = start_dt, end_dt
+        self.mode = mode
+        self.budget_pages = budget_pages
+        self.deadline = deadline
+        self.accounts = max(1, accounts)
+        self.stratum_hours = 1 if mode == 'stratified' else interval_hours
+        self.min_pages = min_pages
+        self.page_size = page_size
+        self.requests_per_minute = requests_per_minute
+        self.page_delay_sec = page_delay_sec
+        self.interval_delay_sec = interval_delay_sec
+        self.page_latency_sec = page_latency_sec
+
+    @classmethod
+    def from_params(cls, query_params, accounts=1):
+        start_dt = datetime.strptime(query_params.get('start_dt', DEFAULT_START_DT_STR), '%Y-%m-%d %H:%M:%S')
+        end_dt = datetime.strptime(query_params.get('end_dt', DEFAULT_END_DT_STR), '%Y-%m-%d %H:%M:%S')
+        deadline = (query_params.get('plan_deadline') or '').strip()
+        try:
+            deadline = datetime.strptime(deadline, '%Y-%m-%d %H:%M:%S') if deadline else None
+        except ValueError:
+            raise ValueError(f"Son tarih YYYY-MM-DD HH:MM:SS olmalı: '{deadline}'")
+        return cls(start_dt, end_dt, query_params.get('plan_budget_pages', DEFAULT_PLAN_BUDGET_PAGES),
+                   mode=query_params.get('plan_mode', DEFAULT_PLAN_MODE), deadline=deadline, accounts=accounts,
+                   interval_hours=query_params.get('interval_hours', DEFAULT_INTERVAL_HOURS),
+                   min_pages=query_params.get('plan_min_pages', DEFAULT_PLAN_MIN_PAGES),
+                   page_size=query_params.get('search_page_size', DEFAULT_SEARCH_PAGE_SIZE),
+                   requests_per_minute=query_params.get('requests_per_minute', DEFAULT_REQUESTS_PER_MINUTE),
+                   page_delay_sec=query_params.get('page_request_delay_sec', DEFAULT_PAGE_REQUEST_DELAY_SEC),
+                   interval_delay_sec=query_params.get('request_delay_sec', DEFAULT_REQUEST_DELAY_SEC))
+
+    def strata(self):
+        strata = []
+        current_dt = self.start_dt
+        while current_dt < self.end_dt:
+            until_dt = min(current_dt + timedelta(hours=self.stratum_hours), self.end_dt)
+            strata.append((current_dt, until_dt))
+            current_dt = until_dt
+        return strata
+
+    def seconds_per_page(self):
+        return max(self.page_delay_sec + self.page_latency_sec, 60.0 / (self.requests_per_minute * self.accounts))
+
+    def duration_sec(self, pages, strata_count):
+        return pages * self.seconds_per_page() + strata_count * self.interval_delay_sec
+
+    def effective_budget(self, now=None):
+        """The budget, cut down to what fits before the deadline."""
+        if self.deadline is None:
+            return self.budget_pages
+        available_sec = (self.deadline - (now or datetime.now())).total_seconds() - len(self.strata()) * self.interval_delay_sec
+        return max(0, min(self.budget_pages, int(available_sec / self.seconds_per_page())))
+
+    @staticmethod
+    def _apportion(total, weights, caps=None):
+        """Split `total` pages in proportion to `weights` (largest remainder), never above `caps`."""
+        allocation = [0] * len(weights)
+        open_slots = [i for i, w in enumerate(weights) if w > 0 and (caps is None or caps[i] > 0)]
+        while total > 0 and open_slots:
+            weight_sum = sum(weights[i] for i in open_slots)
+            shares = {i: total * weights[i] / weight_sum for i in open_slots}
+            if caps is not None:
+                shares = {i: min(share, caps[i] - allocation[i]) for i, share in shares.items()}
+            given = {i: int(share) for i, share in shares.items()}
+            leftover = total - sum(given.values())
+            for i in sorted(shares, key=lambda i: shares[i] - given[i], reverse=True):
+                if leftover <= 0:
+                    break
+                if caps is None or allocation[i] + given[i] < caps[i]:
+                    given[i] += 1
+                    leftover -= 1
+            for i, pages in given.items():
+                allocation[i] += pages
+            total -= sum(given.values())
+            if not any(given.values()):
+                break
+            open_slots = [i for i in open_slots if caps is None or allocation[i] < caps[i]]
+        return allocation
+
+    @staticmethod
+    def _spread(total, count):
+        """`total` pages over `count` strata as evenly as possible, remainders spaced out across the range."""
+        if count <= 0:
+            return []
+        base, extra = divmod(total, count)
+        boosted = {int(i * count / extra) for i in range(extra)}
+        return [base + (i in boosted) for i in range(count)]
+
+    def initial_allocation(self, budget=None):
+        """Pages per stratum for the first pass."""
+        budget = self.effective_budget() if budget is None else budget
+        strata_count = len(self.strata())
+        if self.mode == 'stratified':
+            # A budget too small for the minimum becomes a systematic sample of the hours.
+            return self._spread(min(budget, self.min_pages * strata_count), strata_count)
+        return self._spread(budget, strata_count)
+
+    def allocate_remaining(self, remaining_budget, observations):
+        """Second stratified pass from first-pass observations.
+
+        Each observation has 'collected', 'pages', 'oldest_dt' and
+        'exhausted'. Newest-first search results mean the first pages cover
+        the end of the hour; the share of the hour they cover gives the
+        hour's estimated total.
+        """
+        estimates, caps = [], []
+        for (since_dt, until_dt), seen in zip(self.strata(), observations):
+            collected = seen.get('collected', 0) if seen else 0
+            if not seen or seen.get('exhausted') or not collected or not seen.get('oldest_dt'):
+                estimates.append(0)
+                caps.append(0)
+                continue
+            covered_sec = max(60.0, (until_dt - seen['oldest_dt']).total_seconds())
+            estimated_total = collected * max(1.0, (until_dt - since_dt).total_seconds() / covered_sec)
+            estimates.append(estimated_total)
+            caps.append(max(0, -(-int(estimated_total) // self.page_size) - seen.get('pages', 0)))
+        return self._apportion(max(0, remaining_budget), estimates, caps), estimates
+
+    def report(self, now=None):
+        now = now or datetime.now()
+        strata = self.strata()
+        budget = self.effective_budget(now)
+        lines = [f"Mod: {self.mode}, {len(strata)} katman ({self.stratum_hours} saat), {self.accounts} hesap",
+                 f"Bütçe: {self.budget_pages} sayfa" + (f", son tarihe sığan: {budget}" if budget < self.budget_pages else "")]
+        allocation = self.initial_allocation(budget)
+        if self.mode == 'stratified':
+            lines.append(f"İlk geçiş: {sum(allocation)} sayfa (saat başına {self.min_pages}), yoğunluğa göre dağıtılacak: {budget - sum(allocation)}")
+            if self.min_pages * len(strata) > budget:
+                lines.append(f"UYARI: bütçe her saate {self.min_pages} sayfa vermeye yetmiyor; saatler eşit aralıklı örneklenecek.")
+        else:
+            lines.append(f"Katman başına {min(allocation, default=0)}–{max(allocation, default=0)} sayfa")
+        duration = self.duration_sec(budget, len(strata))
+        lines.append(f"Sayfa başına ~{self.seconds_per_page():.1f} sn, tahmini süre {timedelta(seconds=int(duration))}")
+        lines.append(f"Tahmini bitiş: {now + timedelta(seconds=duration):%Y-%m-%d %H:%M}" +
+                     (f" (son tarih {self.deadline:%Y-%m-%d %H:%M})" if self.deadline else ""))
+        if self.deadline and now + timedelta(seconds=self.duration_sec(self.budget_pages, len(strata))) > self.deadline:
+            lines.append("UYARI: tüm bütçe son tarihe yetişmiyor; bütçe kısaltıldı.")
+        return lines
 
 class TwitterScraper:
     def __init__(self, app_callbacks, query_params):
         self.app_callbacks = app_callbacks
         self.query_params = query_params
-        self.client_manager = TwitterClientManager(app_callbacks, query_params.get('lang', DEFAULT_LANG))
-        self.excel_exporter = ExcelExporter(query_params.get('excel_file', DEFAULT_EXCEL_FILE), app_callbacks)
+        self.client_manager = TwitterClientManager(query_params.get('lang', DEFAULT_LANG),
+                                                   breaker_failure_threshold=query_params.get('breaker_failure_threshold', DEFAULT_BREAKER_FAILURE_THRESHOLD),
+                                                   breaker_cooldown_sec=query_params.get('breaker_cooldown_sec', DEFAULT_BREAKER_COOLDOWN_SEC),
+                                                   requests_per_minute=query_params.get('requests_per_minute', DEFAULT_REQUESTS_PER_MINUTE))
+        self.retry_policy = RetryPolicy.from_params(query_params)
+        self.profile_cache = UserProfileCache(query_params.get('profile_cache_file') or
+                                              UserProfileCache.path_for(query_params.get('excel_file', DEFAULT_EXCEL_FILE)))
+        self.failed_pages = FailedPageLedger(query_params.get('excel_file', DEFAULT_EXCEL_FILE),
+                                             max_attempts=query_params.get('backfill_max_attempts', DEFAULT_BACKFILL_MAX_ATTEMPTS))
+        self.excel_exporter = ExcelExporter(query_params.get('excel_file', DEFAULT_EXCEL_FILE), app_callbacks,
+                                            autosave_rows=query_params.get('autosave_rows', DEFAULT_AUTOSAVE_ROWS),
+                                            autosave_sec=query_params.get('autosave_sec', DEFAULT_AUTOSAVE_SEC),
+                                            autosave_min_gap_factor=query_params.get('autosave_min_gap_factor', DEFAULT_AUTOSAVE_MIN_GAP_FACTOR))
+        self.profiler = IntervalProfiler(query_params.get('excel_file', DEFAULT_EXCEL_FILE),
+                                         enabled=query_params.get('profile', False))
+        self.entity_counter = EntityCounter(query_params.get('entity_top_n', DEFAULT_ENTITY_TOP_N))
+        if self.entity_counter.top_n:
+            self.excel_exporter.register_sheet(EntityCounter.SHEET_TITLE, EntityCounter.SHEET_HEADER)
+        self.interval_summary = None
+        self._partial_aggregates = {}
+        if query_params.get('interval_summary', True):
+            self.interval_summary = IntervalSummary(query_params.get('summary_top_users', DEFAULT_SUMMARY_TOP_USERS))
+            self.excel_exporter.register_sheet(IntervalSummary.SHEET_TITLE, IntervalSummary.SHEET_HEADER)
+        self.near_dups = None
+        self.near_dup_mode = query_params.get('near_dup_mode', DEFAULT_NEAR_DUP_MODE)
+        if self.near_dup_mode != 'off':
+            self.near_dups = NearDuplicateIndex(query_params.get('near_dup_capacity', DEFAULT_NEAR_DUP_CAPACITY))
+        self.disk_writer = BackgroundWriter("store-write")
+        self.profiler.watch_thread("excel-save", lambda: self.excel_exporter.save_seconds)
+        self.profiler.watch_thread("store-write", lambda: self.disk_writer.busy_seconds)
+        self.tweet_store = None
+        if query_params.get('tweet_store'):
+            self.tweet_store = TweetStore(TweetStore.path_for(query_params.get('excel_file', DEFAULT_EXCEL_FILE)))
+        self.expander = None
+        if query_params.get('expand_min_retweets', 0) or query_params.get('expand_min_faves', 0):
+            self.expander = ConversationExpander(self.client_manager, self.excel_exporter, self._request_with_retry,
+                                                 min_retweets=query_params.get('expand_min_retweets', 0),
+                                                 min_faves=query_params.get('expand_min_faves', 0),
+                                                 workers=query_params.get('expand_workers', DEFAULT_EXPAND_WORKERS))
         
         self.is_running = False
         self.is_paused = False
@@ -293,12 +2024,18 @@ class TwitterScraper:
         
         self.loop.run_until_complete(self._initialize_client(initial_credentials))
         if not self.client_ready_event.is_set():
-            self.app_callbacks['log_message']("Başlangıç client oluşturulamadı. Scraping başlatılamıyor.", "CRITICAL")
+            logger.critical("Başlangıç client oluşturulamadı. Scraping başlatılamıyor.")
             self.is_running = False
+            self.close_stores()
             self.app_callbacks['on_scraping_finished']() 
             return
 
-        self.loop.create_task(self._scraping_loop())
+        if self.query_params.get('mode') == 'refresh':
+            self.loop.create_task(self._run_then_close(self._refresh_loop()))
+        elif self.query_params.get('plan_mode', DEFAULT_PLAN_MODE) != 'off':
+            self.loop.create_task(self._run_then_close(self._planned_scraping_loop()))
+        else:
+            self.loop.create_task(self._run_then_close(self._scraping_loop()))
         
         def run_loop():
             try:
@@ -312,48 +2049,46 @@ class TwitterScraper:
     def pause_scraping(self):
         if self.is_running and not self.is_paused:
             self.is_paused = True
-            self.app_callbacks['log_message']("Scraping duraklatıldı.", "INFO")
+            logger.info("Scraping duraklatıldı.")
             self.app_callbacks['update_status']("Duraklatıldı")
 
     def resume_scraping(self):
         if self.is_running and self.is_paused:
             if not self.client_ready_event.is_set():
-                self.app_callbacks['log_message']("Client hazır değil. Devam ettirmeden önce giriş yapın/hesap değiştirin.", "WARN")
+                logger.warning("Client hazır değil. Devam ettirmeden önce giriş yapın/hesap değiştirin.")
                 self.app_callbacks['request_new_credentials_for_resume'](self.current_task_state)
                 return
             self.is_paused = False
-            self.app_callbacks['log_message']("Scraping devam ediyor...", "INFO")
+            logger.info("Scraping devam ediyor...")
 
     def stop_scraping(self):
         if self.is_running:
             self.stop_requested = True
             self.is_running = False 
             self.is_paused = False 
-            self.app_callbacks['log_message']("Scraping durduruluyor...", "INFO")
+            logger.info("Scraping durduruluyor...")
+            self.excel_exporter.save_workbook()
             if self.loop and not self.loop.is_closed():
                  self.loop.call_soon_threadsafe(self.loop.stop)
 
 
     def save_current_data(self):
-        self.app_callbacks['log_message']("Mevcut veriler kaydediliyor...", "INFO")
-        if self.excel_exporter.save_workbook():
-            self.app_callbacks['log_message']("Veriler başarıyla kaydedildi.", "OK")
-        else:
-            self.app_callbacks['log_message']("Veri kaydetme başarısız.", "ERROR")
+        self.excel_exporter.save_workbook()
+        logger.info("Mevcut veriler arka planda kaydediliyor...")
 
     async def switch_account_and_resume(self, new_credentials, resume_state):
         self.current_task_state = resume_state 
         self.is_paused = True 
         self.client_ready_event.clear()
         
-        self.app_callbacks['log_message'](f"Yeni hesap ({new_credentials.get('username', 'Bilinmeyen')}) ile devam edilecek...", "INFO")
+        logger.info("Yeni hesap (%s) ile devam edilecek...", new_credentials.get('username', 'Bilinmeyen'))
         
         login_success = await self._initialize_client(new_credentials)
         if login_success:
             self.is_paused = False 
-            self.app_callbacks['log_message']("Hesap değiştirildi, scraping devam edecek.", "OK")
+            logger.log(OK, "Hesap değiştirildi, scraping devam edecek.")
         else:
-            self.app_callbacks['log_message']("Yeni hesapla giriş başarısız. Scraping duraklatıldı.", "ERROR")
+            logger.error("Yeni hesapla giriş başarısız. Scraping duraklatıldı.")
 
     def _build_query(self, since: datetime, until: datetime, keywords, lang, max_id=None):
         s_utc = since.strftime('%Y-%m-%d_%H:%M:%S_UTC')
@@ -364,52 +2099,111 @@ class TwitterScraper:
         return query
 
     async def _fetch_page_data(self, client, query, product, count, client_identifier, since_dt, until_dt):
-        page_retries = 0
-        max_retries_default = 3
-        max_retries_ratelimit = 2 
+        log_fields = log_context(client_identifier, since_dt, until_dt, self.current_task_state.get('page_num', 0) + 1 if self.current_task_state else None)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("search_tweet (Query: '%s...')", query[:70], extra=log_fields)
+        return await self._request_with_retry(lambda: client.search_tweet(query=query, product=product, count=count),
+                                              client_identifier, log_fields, "search_tweet")
+
+    async def _request_with_retry(self, request, client_identifier, log_fields, operation, reserve=0):
+        """Run `request()` under the account budget, retry policy and circuit breaker.
+
+        `reserve` tokens of the budget are left for other callers (see RequestBudget.acquire).
+        """
+        from twikit import TwitterException
+        from twikit.errors import Forbidden, Unauthorized, AccountLocked
 
-        while page_retries < max_retries_default:
+        breaker = self.client_manager.breaker_for(client_identifier)
+        attempts = {}
+
+        while True:
             try:
-                self.app_callbacks['log_message'](f"{client_identifier} | {since_dt.strftime('%H:%M')}–{until_dt.strftime('%H:%M')}: search_tweet (Query: '{query[:70]}...'), Deneme: {page_retries+1}", "DEBUG")
-                raw_page_results = await client.search_tweet(query=query, product=product, count=count)
-                return raw_page_results
+                await self.client_manager.budget_for(client_identifier).acquire(reserve=reserve)
+                result = await request()
+                breaker.record_success()
+                return result
             except (Forbidden, Unauthorized, AccountLocked) as e:
-                self.app_callbacks['log_message'](f"API Yetki/Hesap Kilit Hatası ({type(e).__name__}: {e}) | {client_identifier}.", "ERROR")
+                logger.error("API Yetki/Hesap Kilit Hatası (%s: %s).", type(e).__name__, e, extra=log_fields)
+                breaker.trip(permanent=True)
                 raise CriticalClientError(f"Client yetkisi sonlandı/hesap kilitli: {e}", client_identifier)
-            except TooManyRequests as e:
-                if page_retries < max_retries_ratelimit:
-                    page_retries += 1
-                    self.app_callbacks['log_message'](f"search_tweet Rate limit | {client_identifier}. {DEFAULT_RATE_LIMIT_WAIT_SEC}s uyku (Deneme {page_retries}/{max_retries_ratelimit+1})...", "WARN")
-                    await asyncio.sleep(DEFAULT_RATE_LIMIT_WAIT_SEC)
-                else:
-                    self.app_callbacks['log_message'](f"{client_identifier} | Sürekli rate-limit. Client değiştirme sinyali.", "ERROR")
-                    raise TemporaryClientError(f"Rate limit aşıldı: {e}", client_identifier) 
-            except TwitterException as e:
-                err_msg_lower = str(e).lower()
-                if any(keyword in err_msg_lower for keyword in ["suspended", "terminated", "deactivated", "restricted"]):
-                    self.app_callbacks['log_message'](f"Kritik Twitter Hesap Hatası ({type(e).__name__}: {e}) | {client_identifier}.", "ERROR")
-                    raise CriticalClientError(f"Kritik Twitter Hesap Hatası: {e}", client_identifier)
-                
-                self.app_callbacks['log_message'](f"search_tweet sırasında TwitterException ({e}) | {client_identifier}. Sayfa atlanıyor.", "WARN")
-                return [] 
-            except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.ConnectError, httpx.NetworkError) as e:
-                page_retries +=1
-                wait_net = randint(10,20)
-                self.app_callbacks['log_message'](f"Ağ hatası ({type(e).__name__}) | {client_identifier}. {wait_net}s uyku (Deneme {page_retries}/{max_retries_default})...", "WARN")
-                await asyncio.sleep(wait_net)
-                if page_retries >= max_retries_default:
-                    self.app_callbacks['log_message'](f"{client_identifier} | Sürekli ağ hatası. Sayfa atlanıyor.", "ERROR")
-                    return []
             except Exception as e:
-                self.app_callbacks['log_message'](f"Genel hata ({type(e).__name__}: {e}) | {client_identifier}. Sayfa atlanıyor.", "ERROR")
-                return [] 
-        return [] 
+                if self.retry_policy.is_missing_resource(e):
+                    # The server answered; not retried and not counted against the account.
+                    breaker.record_success()
+                    raise ResourceUnavailable(f"{type(e).__name__}: {e}", client_identifier) from e
+                if isinstance(e, TwitterException) and any(keyword in str(e).lower() for keyword in ["suspended", "terminated", "deactivated", "restricted"]):
+                    logger.error("Kritik Twitter Hesap Hatası (%s: %s).", type(e).__name__, e, extra=log_fields)
+                    breaker.trip(permanent=True)
+                    raise CriticalClientError(f"Kritik Twitter Hesap Hatası: {e}", client_identifier)
 
+                error_class = self.retry_policy.classify(e)
+                attempt = attempts.get(error_class, 0)
+                budget = self.retry_policy.budgets[error_class]
+                if attempt < budget:
+                    attempts[error_class] = attempt + 1
+                    wait_sec = self.retry_policy.backoff(error_class, attempt)
+                    logger.warning("%s: %s hatası (%s: %s). %.1fs uyku (Deneme %d/%d)...", operation, error_class, type(e).__name__, e, wait_sec, attempt + 1, budget, extra=log_fields)
+                    await asyncio.sleep(wait_sec)
+                    continue
+
+                if error_class == 'rate_limit':
+                    cooldown = self.retry_policy.rate_limit_cooldown(e, self.client_manager.breaker_cooldown_sec)
+                    breaker.trip(cooldown=cooldown)
+                    logger.error("Sürekli rate-limit. %.0fs rotasyon dışı.", cooldown, extra=log_fields)
+                    raise TemporaryClientError(f"Rate limit aşıldı: {e}", client_identifier)
+
+                if self.retry_policy.counts_against_account(e, error_class):
+                    breaker.record_failure()
+                    if breaker.is_open:
+                        logger.error("Art arda %d başarısız istek. %ss rotasyon dışı.", breaker.failures, self.client_manager.breaker_cooldown_sec, extra=log_fields)
+                        raise TemporaryClientError(f"Devre açıldı ({error_class}): {e}", client_identifier)
+                logger.error("%s: %s deneme hakkı bitti (%s: %s). İstek atlanıyor.", operation, error_class, type(e).__name__, e, extra=log_fields)
+                raise PageFetchAbandoned(f"{error_class}: {type(e).__name__}: {e}", client_identifier)
+
+
+    async def _run_then_close(self, scraping_loop):
+        try:
+            await scraping_loop
+        finally:
+            await asyncio.to_thread(self.close_stores)
+
+    def close_stores(self, timeout=None):
+        """Finish queued disk writes and close the caches and stores; the scraper is done afterwards."""
+        self.disk_writer.close(timeout)
+        self.profile_cache.close()
+        if self.tweet_store:
+            self.tweet_store.close()
+
+    async def _wait_for_writes(self):
+        await asyncio.to_thread(self.excel_exporter.wait_for_saves)
+        await asyncio.to_thread(self.disk_writer.flush)
+
+    async def _switch_client_after_error(self, error):
+        """Rotate to a usable account, waiting out breaker cooldowns; False when only new credentials can help."""
+        while self.is_running and not self.stop_requested:
+            if self.client_manager.rotate():
+                _, identifier = self.client_manager.get_client_details()
+                logger.warning("Client hatası: %s. %s hesabına geçiliyor.", error, identifier)
+                self.app_callbacks['update_current_account'](identifier)
+                return True
+            wait_sec = self.client_manager.seconds_until_available()
+            if wait_sec is None:
+                return False
+            logger.warning("Tüm hesapların devresi açık; %.0f saniye bekleniyor.", wait_sec)
+            self.app_callbacks['update_status'](f"Hesap devresi açık ({wait_sec:.0f} sn)")
+            deadline = time.monotonic() + wait_sec
+            while time.monotonic() < deadline and self.is_running and not self.stop_requested:
+                await asyncio.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+        return True
 
     async def _fetch_interval_data(self, since_dt, until_dt):
+        from twikit.tweet import Tweet
+
         client, client_identifier = self.client_manager.get_client_details()
         if not client:
             raise CriticalClientError("Client not available for fetching interval.", "N/A")
+        if not self.client_manager.breaker_for(client_identifier).allow():
+            raise TemporaryClientError("Client devresi açık, rotasyon dışı.", client_identifier)
 
         keywords = self.query_params.get('keywords', DEFAULT_QUERY_KEYWORDS)
         lang = self.query_params.get('lang', DEFAULT_LANG)
@@ -421,74 +2215,404 @@ class TwitterScraper:
         current_max_id = self.current_task_state.get('max_id')
         page_num_start = self.current_task_state.get('page_num', 0)
         interval_tweets_collected_count = self.current_task_state.get('collected_in_interval', 0)
+        interval_near_dups = self.current_task_state.get('near_dups', 0)
+        drop_near_dups = self.near_dup_mode == 'drop'
         
         interval_tweets_data = []
         collected_tweet_ids_this_interval = set() 
 
         max_page_fetches = (tweets_per_interval_target // (search_page_size // 2 if search_page_size > 1 else 1) ) + 10
+        # A planned run fixes the page count instead of the tweet target.
+        page_limit = self.current_task_state.get('page_limit')
+        if page_limit is not None:
+            max_page_fetches = page_limit
 
-        for page_num in range(page_num_start, max_page_fetches):
-            if self.stop_requested or not self.is_running: break
-            while self.is_paused: await asyncio.sleep(0.1)
-            if self.stop_requested or not self.is_running: break
-
-            self.current_task_state['page_num'] = page_num
-            query_str = self._build_query(since_dt, until_dt, keywords, lang, current_max_id)
-            raw_page_results = await self._fetch_page_data(client, query_str, product, search_page_size, client_identifier, since_dt, until_dt)
+        try:
+            for page_num in range(page_num_start, max_page_fetches):
+                if self.stop_requested or not self.is_running: break
+                while self.is_paused: await asyncio.sleep(0.1)
+                if self.stop_requested or not self.is_running: break
+
+                self.current_task_state['page_num'] = page_num
+                query_str = self._build_query(since_dt, until_dt, keywords, lang, current_max_id)
+                try:
+                    raw_page_results = await self._fetch_page_data(client, query_str, product, search_page_size, client_identifier, since_dt, until_dt)
+                except PageFetchAbandoned as e:
+                    self.current_task_state['abandoned'] = {'error': str(e), 'client': e.client_identifier}
+                    break
+                self.current_task_state['pages_fetched'] = self.current_task_state.get('pages_fetched', 0) + 1
             
-            current_page_new_tweets_count = 0
-            if raw_page_results:
-                new_tweets_on_page = []
-                for item in raw_page_results:
-                    if isinstance(item, Tweet) and item.id not in self.collected_tweet_ids_total_run and item.id not in collected_tweet_ids_this_interval:
-                        new_tweets_on_page.append(item)
-                        collected_tweet_ids_this_interval.add(item.id)
-                        self.collected_tweet_ids_total_run.add(item.id)
+                current_page_new_tweets_count = 0
+                if raw_page_results:
+                    new_tweets_on_page = []
+                    for item in raw_page_results:
+                        if isinstance(item, Tweet) and item.id not in self.collected_tweet_ids_total_run and item.id not in collected_tweet_ids_this_interval:
+                            new_tweets_on_page.append(item)
+                            collected_tweet_ids_this_interval.add(item.id)
+                            self.collected_tweet_ids_total_run.add(item.id)
                 
-                if new_tweets_on_page:
-                    for t in new_tweets_on_page:
-                        date_str = str(getattr(t, 'created_at', 'N/A'))
-                        try:
-                            dt_obj = t.created_at if isinstance(t.created_at, datetime) else datetime.strptime(str(t.created_at).split('.')[0], '%Y-%m-%dT%H:%M:%S')
-                            date_str = dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-                        except: pass
-                        
-                        tweet_data = {
-                            'id': t.id,
-                            'user_name': getattr(getattr(t, 'user', None), 'name', 'N/A'),
-                            'date_str': date_str,
-                            'text': getattr(t, 'text', '').replace('\n',' ').replace('\r',''),
-                            'retweet_count': getattr(t, 'retweet_count', 0),
-                            'favorite_count': getattr(t, 'favorite_count', 0)
-                        }
-                        interval_tweets_data.append(tweet_data)
-                        current_page_new_tweets_count +=1
+                    if new_tweets_on_page:
+                        page_profiles = {}
+                        for t, entities in zip(new_tweets_on_page, extract_entities(new_tweets_on_page)):
+                            tweet_data = tweet_data_from(t)
+                            if self.near_dups:
+                                tweet_data['dup_cluster'], is_near_dup = self.near_dups.assign(tweet_data['id'], tweet_data['text'])
+                                if is_near_dup:
+                                    interval_near_dups += 1
+                                    if drop_near_dups:
+                                        continue
+                            tweet_data.update(entities)
+                            self.entity_counter.add(entities)
+                            if 'followers_count' in tweet_data:
+                                page_profiles[tweet_data['user_id']] = profile_from_user(t.user)
+                            interval_tweets_data.append(tweet_data)
+                            current_page_new_tweets_count +=1
+                            if self.expander:
+                                self.expander.offer(tweet_data)
+                        self.profile_cache.put_many(page_profiles, self.disk_writer)
                     
-                    interval_tweets_collected_count += current_page_new_tweets_count
-                    self.current_task_state['collected_in_interval'] = interval_tweets_collected_count
-                    self.app_callbacks['log_message'](f"{client_identifier} | {since_dt.strftime('%H:%M')}–{until_dt.strftime('%H:%M')}: Sayfa {page_num+1} - {current_page_new_tweets_count} yeni. Aralıkta: {interval_tweets_collected_count}/{tweets_per_interval_target}", "OK")
+                        interval_tweets_collected_count += current_page_new_tweets_count
+                        self.current_task_state['collected_in_interval'] = interval_tweets_collected_count
+                        self.current_task_state['near_dups'] = interval_near_dups
+                        logger.log(OK, "Sayfa %d - %d yeni. Aralıkta: %d/%d", page_num + 1, current_page_new_tweets_count, interval_tweets_collected_count, tweets_per_interval_target, extra=log_context(client_identifier, since_dt, until_dt, page_num + 1))
                     
-                    oldest_tweet_in_page = new_tweets_on_page[-1]
-                    current_max_id = str(int(oldest_tweet_in_page.id) - 1)
-                    self.current_task_state['max_id'] = current_max_id
+                        oldest_tweet_in_page = new_tweets_on_page[-1]
+                        current_max_id = str(int(oldest_tweet_in_page.id) - 1)
+                        self.current_task_state['max_id'] = current_max_id
+                        self.current_task_state['oldest_dt'] = parse_tweet_date(getattr(oldest_tweet_in_page, 'created_at', None))
+                    else: 
+                        logger.info("Sayfa %d'da yeni tweet yok.", page_num + 1, extra=log_context(client_identifier, since_dt, until_dt, page_num + 1))
+                        self.current_task_state['exhausted'] = True
+                        break 
                 else: 
-                    self.app_callbacks['log_message'](f"{client_identifier} | {since_dt.strftime('%H:%M')}–{until_dt.strftime('%H:%M')}: Sayfa {page_num+1}'da yeni tweet yok.", "INFO")
+                    logger.info("Sayfa %d'dan sonuç alınamadı.", page_num + 1, extra=log_context(client_identifier, since_dt, until_dt, page_num + 1))
+                    self.current_task_state['exhausted'] = True
                     break 
-            else: 
-                self.app_callbacks['log_message'](f"{client_identifier} | {since_dt.strftime('%H:%M')}–{until_dt.strftime('%H:%M')}: Sayfa {page_num+1}'dan sonuç alınamadı.", "INFO")
-                break 
 
-            if interval_tweets_collected_count >= tweets_per_interval_target:
-                self.app_callbacks['log_message'](f"{client_identifier} | {since_dt.strftime('%H:%M')}–{until_dt.strftime('%H:%M')}: Hedef {tweets_per_interval_target} tweete ulaşıldı.", "INFO")
-                break
+                if page_limit is None and interval_tweets_collected_count >= tweets_per_interval_target:
+                    logger.info("Hedef %d tweete ulaşıldı.", tweets_per_interval_target, extra=log_context(client_identifier, since_dt, until_dt, page_num + 1))
+                    break
             
-            if current_page_new_tweets_count > 0 : 
-                 await asyncio.sleep(page_request_delay)
-
-        self.app_callbacks['log_message'](f"{client_identifier} | {since_dt.strftime('%Y-%m-%d %H:%M')}–{until_dt.strftime('%Y-%m-%d %H:%M')}: Toplam {interval_tweets_collected_count} tweet çekildi.", "INFO")
+                # Paced by pages fetched: a page whose tweets were all dropped as near-duplicates still counts.
+                await asyncio.sleep(page_request_delay)
+        except Exception:
+            # Store what the interval already produced so the resume (or the ledger entry) can
+            # continue from max_id; IDs of a page that was not fully processed are released
+            # so that page can be fetched again.
+            if interval_tweets_data:
+                self._store_interval_tweets(interval_tweets_data)
+            stored_ids = {t.get('id') for t in interval_tweets_data}
+            self.collected_tweet_ids_total_run.difference_update(tweet_id for tweet_id in collected_tweet_ids_this_interval
+                                                                 if tweet_id not in stored_ids)
+            raise
+
+        logger.info("Toplam %d tweet çekildi.", interval_tweets_collected_count, extra=log_context(client_identifier, since_dt, until_dt))
+        if interval_near_dups:
+            logger.info("Aralıkta %d yakın kopya %s.", interval_near_dups, "atıldı" if drop_near_dups else "işaretlendi",
+                        extra=log_context(client_identifier, since_dt, until_dt))
         return interval_tweets_data
 
 
+    async def _collect_interval(self, since_dt, until_dt, profile_label, flush_summaries=True):
+        """Fetch, enrich and store one interval; an abandoned page goes to the ledger. Returns the tweet count."""
+        self.profiler.start(profile_label)
+        try:
+            interval_tweets = await self._fetch_interval_data(since_dt, until_dt)
+            await self._process_interval_tweets(interval_tweets)
+        except (CriticalClientError, TemporaryClientError):
+            # The interval resumes from max_id on another account; its counts keep accumulating.
+            raise
+        except Exception as e:
+            # Recorded before the flush, so the interval's aggregates are kept for the backfill.
+            self._record_failed_page(self.current_task_state, f"{type(e).__name__}: {e}", self.client_manager.current_identifier)
+            if flush_summaries:
+                self._flush_interval_summaries(since_dt, until_dt)
+            raise
+        finally:
+            self.profiler.stop()
+
+        abandoned = self.current_task_state.get('abandoned')
+        if abandoned:
+            self._record_failed_page(self.current_task_state, abandoned['error'], abandoned['client'])
+        if flush_summaries:
+            self._flush_interval_summaries(since_dt, until_dt)
+        return len(interval_tweets)
+
+    def _new_interval_aggregates(self):
+        """Fresh per-interval aggregators, configured like the running ones."""
+        aggregates = {'entity_counter': EntityCounter(self.entity_counter.top_n)}
+        if self.interval_summary:
+            aggregates['interval_summary'] = IntervalSummary(self.interval_summary.top_users)
+        return aggregates
+
+    def _flush_interval_summaries(self, since_dt, until_dt):
+        """Write the interval's summary rows, once per interval.
+
+        While the interval has a pending failed page its aggregates are kept,
+        so the backfill merges into them and rewrites the rows in place. A row
+        left by an earlier run has no aggregates to merge: entity counts are
+        folded back from its rows, the summary gets a row marked as an addition.
+        """
+        interval = (f"{since_dt:%Y-%m-%d %H:%M:%S}", f"{until_dt:%Y-%m-%d %H:%M:%S}")
+        exporter = self.excel_exporter
+        current = {name: getattr(self, name) for name in self._new_interval_aggregates()}
+        earlier = self._partial_aggregates.pop(interval, None)
+        if earlier:
+            for name, aggregate in current.items():
+                aggregate.merge(earlier[name])
+        entity_rows_exist = self.entity_counter.top_n and \
+            (earlier or interval in exporter.sheets[EntityCounter.SHEET_TITLE]['loaded_intervals'])
+        if entity_rows_exist and not earlier:
+            self.entity_counter.merge_rows(exporter.interval_rows(EntityCounter.SHEET_TITLE, interval))
+        if self.failed_pages.has_pending(*interval, self._ledger_query()):
+            kept = self._new_interval_aggregates()
+            for name, aggregate in kept.items():
+                aggregate.merge(current[name])
+            self._partial_aggregates[interval] = kept
+
+        rows = self.entity_counter.flush(since_dt, until_dt)
+        if entity_rows_exist:
+            exporter.replace_interval_rows(EntityCounter.SHEET_TITLE, interval, rows)
+        elif rows and self.entity_counter.top_n:
+            exporter.append_sheet_rows(EntityCounter.SHEET_TITLE, rows)
+        if self.interval_summary:
+            if earlier:
+                exporter.replace_interval_rows(IntervalSummary.SHEET_TITLE, interval,
+                                               [self.interval_summary.flush(since_dt, until_dt)])
+            else:
+                delta = interval in exporter.sheets[IntervalSummary.SHEET_TITLE]['loaded_intervals']
+                exporter.append_sheet_rows(IntervalSummary.SHEET_TITLE,
+                                           [self.interval_summary.flush(since_dt, until_dt, "Önceki satıra ek" if delta else None)])
+
+    async def _enrich_missing_profiles(self, interval_tweets):
+        """Fill author fields for tweets whose search result carried no user object."""
+        missing = {t['user_id'] for t in interval_tweets if t.get('user_id') and 'followers_count' not in t}
+        if not missing:
+            return
+        profiles = self.profile_cache.get_many(list(missing))
+        to_fetch = [user_id for user_id in missing if user_id not in profiles]
+        client, client_identifier = self.client_manager.get_client_details()
+        if to_fetch and client and self.query_params.get('fetch_missing_profiles', True):
+            from twikit.errors import UserNotFound, UserUnavailable
+
+            async def fetch_profile(user_id):
+                # A deleted or protected author is an answer, not a failure of the account.
+                try:
+                    return await client.get_user_by_id(user_id)
+                except (UserNotFound, UserUnavailable):
+                    return None
+
+            log_fields = log_context(client_identifier)
+            batch_size = self.query_params.get('profile_fetch_batch_size', DEFAULT_PROFILE_FETCH_BATCH_SIZE)
+            fetched = {}
+            for start in range(0, len(to_fetch), batch_size):
+                if not self.client_manager.breaker_for(client_identifier).allow():
+                    logger.warning("Profil zenginleştirme durdu (hesap devresi açık); kalan %d profil atlandı.", len(to_fetch) - start, extra=log_fields)
+                    break
+                batch = to_fetch[start:start + batch_size]
+                results = await asyncio.gather(*(self._request_with_retry(lambda user_id=user_id: fetch_profile(user_id), client_identifier,
+                                                                          log_fields, "get_user_by_id")
+                                                 for user_id in batch), return_exceptions=True)
+                client_error = None
+                for user_id, result in zip(batch, results):
+                    if isinstance(result, (CriticalClientError, TemporaryClientError)):
+                        client_error = result
+                    elif result is not None and not isinstance(result, BaseException):
+                        fetched[user_id] = profile_from_user(result)
+                if client_error:
+                    logger.warning("Profil zenginleştirme durdu (%s); kalan %d profil atlandı.", client_error, len(to_fetch) - start - len(batch),
+                                   extra=log_fields)
+                    break
+            self.profile_cache.put_many(fetched, self.disk_writer)
+            profiles.update(fetched)
+            logger.debug("Profil zenginleştirme: %d önbellekten, %d istekle.", len(missing) - len(to_fetch), len(fetched),
+                         extra=log_context(client_identifier))
+        for t in interval_tweets:
+            profile = profiles.get(t.get('user_id'))
+            if profile and 'followers_count' not in t:
+                t.update(profile)
+
+    async def _process_interval_tweets(self, interval_tweets):
+        try:
+            if interval_tweets:
+                await self._enrich_missing_profiles(interval_tweets)
+        finally:
+            # The cursor has already moved past these tweets, so they are stored even unenriched.
+            self._store_interval_tweets(interval_tweets)
+
+    def _store_interval_tweets(self, interval_tweets):
+        if interval_tweets:
+            self.excel_exporter.append_tweets(interval_tweets)
+            if self.interval_summary:
+                self.interval_summary.add_many(interval_tweets)
+            if self.tweet_store:
+                self.disk_writer.submit(self.tweet_store.add_many, interval_tweets)
+
+    def _record_failed_page(self, task_state, error, client_identifier):
+        entry = self.failed_pages.record(task_state.get('since'), task_state.get('until'), task_state.get('max_id'),
+                                         task_state.get('page_num', 0), error, client_identifier,
+                                         self._ledger_query(), task_state.get('collected_in_interval', 0))
+        logger.warning("Başarısız sayfa kaydedildi: %s–%s max_id=%s (%s)", entry['since'], entry['until'], entry['max_id'], error)
+
+    def _ledger_query(self):
+        return {'keywords': self.query_params.get('keywords', DEFAULT_QUERY_KEYWORDS),
+                'lang': self.query_params.get('lang', DEFAULT_LANG),
+                'product': self.query_params.get('product', DEFAULT_PRODUCT)}
+
+    async def _backfill_failed_pages(self):
+        all_pending = self.failed_pages.pending()
+        pending = self.failed_pages.pending(self._ledger_query())
+        if len(pending) < len(all_pending):
+            logger.info("Geri doldurma: farklı sorguya ait %s kayıt atlandı.", len(all_pending) - len(pending))
+        if not pending:
+            return
+        logger.info("Geri doldurma: %s başarısız sayfa yeniden deneniyor...", len(pending))
+        self.app_callbacks['update_status'](f"Geri doldurma ({len(pending)})")
+
+        for entry in pending:
+            if self.stop_requested or not self.is_running:
+                break
+            while self.is_paused and self.is_running and not self.stop_requested:
+                await asyncio.sleep(0.5)
+            if not self.client_manager.select_client(exclude=entry['client']):
+                logger.warning("Geri doldurma için uygun client yok.")
+                break
+            _, identifier = self.client_manager.get_client_details()
+            self.app_callbacks['update_current_account'](identifier)
+
+            since_dt = datetime.strptime(entry['since'], '%Y-%m-%d %H:%M:%S')
+            until_dt = datetime.strptime(entry['until'], '%Y-%m-%d %H:%M:%S')
+            # Resume where the interval stopped: same page budget, same count towards the target.
+            state = self.current_task_state = {'since': since_dt, 'until': until_dt, 'max_id': entry['max_id'],
+                                               'page_num': entry.get('page_num', 0), 'collected_in_interval': entry.get('collected', 0)}
+            try:
+                interval_tweets = await self._fetch_interval_data(since_dt, until_dt)
+                await self._process_interval_tweets(interval_tweets)
+                abandoned = state.get('abandoned')
+                if abandoned:
+                    self.failed_pages.mark_failed(entry, abandoned['error'], abandoned['client'], state.get('max_id'),
+                                                  state.get('page_num'), state.get('collected_in_interval'))
+                else:
+                    self.failed_pages.mark_recovered(entry, len(interval_tweets), identifier)
+            except Exception as e:
+                self.failed_pages.mark_failed(entry, f"{type(e).__name__}: {e}", identifier, state.get('max_id'),
+                                              state.get('page_num'), state.get('collected_in_interval'))
+            self._flush_interval_summaries(since_dt, until_dt)
+            await asyncio.sleep(self.query_params.get('request_delay_sec', DEFAULT_REQUEST_DELAY_SEC))
+
+        self.current_task_state = None
+        recovered, unrecoverable, still_pending = self.failed_pages.summary()
+        logger.info("Geri doldurma özeti: %s kurtarıldı, %s kurtarılamadı, %s beklemede. Kayıt: %s", len(recovered), len(unrecoverable), len(still_pending), self.failed_pages.path)
+        for entry in unrecoverable:
+            logger.warning("Kurtarılamadı: %s–%s max_id=%s (%s)", entry['since'], entry['until'], entry['max_id'], entry['error'])
+
+    def _append_engagement_delta(self, delta_rows):
+        import csv
+
+        path = os.path.splitext(self.query_params.get('excel_file', DEFAULT_EXCEL_FILE))[0] + "_engagement_delta.csv"
+        is_new = not os.path.exists(path)
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(['tweet_id', 'rt_eski', 'rt_yeni', 'likes_eski', 'likes_yeni', 'guncelleme'])
+            writer.writerows(delta_rows)
+        return path
+
+    async def _refresh_loop(self):
+        """Re-fetch RT/like counts of tweets already in the output file, youngest first."""
+        exporter = self.excel_exporter
+        id_col, date_col = exporter.HEADER.index('Tweet ID'), exporter.HEADER.index('Tarih')
+        rt_col, likes_col = exporter.HEADER.index('RT'), exporter.HEADER.index('Likes')
+        batch_size = self.query_params.get('refresh_batch_size', DEFAULT_REFRESH_BATCH_SIZE)
+        priority_age = timedelta(hours=self.query_params.get('refresh_priority_age_hours', DEFAULT_REFRESH_PRIORITY_AGE_HOURS))
+        mode = self.query_params.get('refresh_mode', DEFAULT_REFRESH_MODE)
+        request_delay_sec = self.query_params.get('request_delay_sec', DEFAULT_REQUEST_DELAY_SEC)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        targets = []
+        for index, row in enumerate(exporter.rows):
+            tweet_id = row[id_col] if len(row) > id_col else None
+            if tweet_id:
+                targets.append((index, str(tweet_id), parse_tweet_date(row[date_col])))
+        if not targets:
+            logger.warning("'%s' içinde Tweet ID sütunu dolu satır yok; güncellenecek tweet bulunamadı.", exporter.filename)
+        targets.sort(key=lambda target: (0 if target[2] and now - target[2] <= priority_age else 1 if target[2] else 2,
+                                         -target[2].timestamp() if target[2] else 0))
+        logger.info("Etkileşim güncelleme: %d tweet, %d'lik gruplar halinde (%s).", len(targets), batch_size, mode)
+
+        position = changed = missing = skipped = 0
+        while position < len(targets) and self.is_running and not self.stop_requested:
+            while self.is_paused and self.is_running and not self.stop_requested:
+                await asyncio.sleep(0.5)
+            if self.stop_requested or not self.is_running: break
+            if not self.client_ready_event.is_set():
+                self.is_paused = True
+                self.app_callbacks['update_status']("Hesap bekleniyor...")
+                await self.client_ready_event.wait()
+                self.is_paused = False
+
+            batch = targets[position:position + batch_size]
+            client, identifier = self.client_manager.get_client_details()
+            self.app_callbacks['update_status'](f"Güncelleme {position}/{len(targets)}")
+            try:
+                if not client or not self.client_manager.breaker_for(identifier).allow():
+                    raise TemporaryClientError("Client devresi açık, rotasyon dışı.", identifier)
+                tweets = await self._request_with_retry(lambda: client.get_tweets_by_ids([target[1] for target in batch]),
+                                                        identifier, log_context(identifier), "get_tweets_by_ids")
+            except (CriticalClientError, TemporaryClientError) as e:
+                if await self._switch_client_after_error(e):
+                    continue
+                logger.error("Client hatası: %s. Yeni hesap bilgileri gerekiyor.", e)
+                self.is_paused = True
+                self.client_ready_event.clear()
+                self.app_callbacks['request_new_credentials_for_resume']({'refresh_position': position})
+                continue
+            except PageFetchAbandoned:
+                skipped += len(batch)
+                position += len(batch)
+                continue
+
+            refreshed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            by_id = {t.id: t for t in tweets if t is not None}
+            delta_rows, store_updates = [], []
+            for index, tweet_id, _ in batch:
+                t = by_id.get(tweet_id)
+                if t is None:
+                    missing += 1
+                    continue
+                row = exporter.rows[index]
+                old_rt, old_likes = row[rt_col], row[likes_col]
+                new_rt, new_likes = t.retweet_count, t.favorite_count
+                if (old_rt, old_likes) == (new_rt, new_likes):
+                    continue
+                changed += 1
+                if mode == 'delta':
+                    delta_rows.append((tweet_id, old_rt, new_rt, old_likes, new_likes, refreshed_at))
+                else:
+                    exporter.update_row(index, {rt_col: new_rt, likes_col: new_likes})
+                    store_updates.append((tweet_id, new_rt, new_likes))
+            if store_updates and self.tweet_store:
+                self.disk_writer.submit(self.tweet_store.update_engagement, store_updates)
+            if delta_rows:
+                await asyncio.to_thread(self._append_engagement_delta, delta_rows)
+            position += len(batch)
+            logger.info("Güncelleme %d/%d: %d değişti, %d erişilemedi.", position, len(targets), changed, missing, extra=log_context(identifier))
+            if position < len(targets) and self.is_running:
+                await asyncio.sleep(request_delay_sec)
+
+        if self.is_running and not self.stop_requested:
+            logger.log(OK, "Etkileşim güncelleme tamamlandı: %d tweet, %d değişti, %d erişilemedi, %d atlandı.", len(targets), changed, missing, skipped)
+            self.app_callbacks['update_status']("Tamamlandı")
+        elif self.stop_requested:
+            logger.info("Güncelleme kullanıcı tarafından durduruldu (%d/%d).", position, len(targets))
+            self.app_callbacks['update_status']("Durduruldu")
+
+        self.is_running = False
+        if mode != 'delta':
+            self.excel_exporter.save_workbook()
+            await self._wait_for_writes()
+        self.app_callbacks['on_scraping_finished']()
+
     async def _scraping_loop(self):
         start_dt_str = self.query_params.get('start_dt', DEFAULT_START_DT_STR)
         end_dt_str = self.query_params.get('end_dt', DEFAULT_END_DT_STR)
@@ -499,15 +2623,18 @@ class TwitterScraper:
             start_dt = datetime.strptime(start_dt_str, '%Y-%m-%d %H:%M:%S')
             end_dt = datetime.strptime(end_dt_str, '%Y-%m-%d %H:%M:%S')
         except ValueError:
-            self.app_callbacks['log_message']("Geçersiz tarih formatı. YYYY-MM-DD HH:MM:SS kullanın.", "CRITICAL")
+            logger.critical("Geçersiz tarih formatı. YYYY-MM-DD HH:MM:SS kullanın.")
             self.is_running = False
             self.app_callbacks['on_scraping_finished']()
             return
 
+        if self.expander:
+            self.expander.start()
+
         current_dt = start_dt
         if self.current_task_state and 'since' in self.current_task_state and isinstance(self.current_task_state['since'], datetime): 
             current_dt = self.current_task_state['since']
-            self.app_callbacks['log_message'](f"Scraping {current_dt.strftime('%Y-%m-%d %H:%M:%S')} tarihinden devam ediyor...", "INFO")
+            logger.info("Scraping %s tarihinden devam ediyor...", current_dt)
         else: 
              self.current_task_state = {'since': current_dt}
 
@@ -529,12 +2656,12 @@ class TwitterScraper:
             if self.stop_requested or not self.is_running: break
 
             if not self.client_ready_event.is_set():
-                self.app_callbacks['log_message']("Client hazır değil, bekleniyor...", "WARN")
+                logger.warning("Client hazır değil, bekleniyor...")
                 self.is_paused = True 
                 self.app_callbacks['update_status'](f"Hesap bekleniyor...")
                 await self.client_ready_event.wait() 
                 self.is_paused = False 
-                self.app_callbacks['log_message']("Client hazır, devam ediliyor.", "INFO")
+                logger.info("Client hazır, devam ediliyor.")
 
             since_dt = current_dt
             until_dt = min(current_dt + timedelta(hours=interval_hours), end_dt)
@@ -545,41 +2672,280 @@ class TwitterScraper:
             self.app_callbacks['update_status'](f"Aralık {interval_num_display}/{int(total_intervals_approx)}: {since_dt.strftime('%y-%m-%d %H:%M')} - {until_dt.strftime('%y-%m-%d %H:%M')}")
             
             try:
-                interval_tweets = await self._fetch_interval_data(since_dt, until_dt)
-                if interval_tweets:
-                    self.excel_exporter.append_tweets(interval_tweets)
-                
+                await self._collect_interval(since_dt, until_dt, f"{interval_num_display:04d}_{since_dt:%Y%m%d_%H%M}")
                 current_dt = until_dt
                 self.current_task_state = {'since': current_dt} 
                 if current_dt < end_dt and self.is_running: 
                     await asyncio.sleep(request_delay_sec)
 
             except (CriticalClientError, TemporaryClientError) as e:
-                self.app_callbacks['log_message'](f"Client hatası: {e}. Yeni hesap bilgileri gerekiyor.", "ERROR")
+                if await self._switch_client_after_error(e):
+                    continue
+                logger.error("Client hatası: %s. Yeni hesap bilgileri gerekiyor.", e)
                 self.is_paused = True
                 self.client_ready_event.clear()
                 self.app_callbacks['request_new_credentials_for_resume'](self.current_task_state)
             except Exception as e:
-                self.app_callbacks['log_message'](f"Aralık işlenirken genel hata ({type(e).__name__}: {e}). Bu aralık atlanıyor.", "ERROR")
+                logger.error("Aralık işlenirken genel hata (%s: %s). Bu aralık atlanıyor.", type(e).__name__, e)
                 current_dt = until_dt 
                 self.current_task_state = {'since': current_dt} 
                 if current_dt < end_dt and self.is_running:
                     await asyncio.sleep(request_delay_sec) 
 
         if self.is_running and not self.stop_requested:
-            self.app_callbacks['log_message']("Tüm aralıklar tamamlandı.", "OK")
+            await self._backfill_failed_pages()
+        if self.expander:
+            if self.is_running and not self.stop_requested:
+                self.app_callbacks['update_status']("Konuşmalar tamamlanıyor...")
+                await self.expander.drain()
+            await self.expander.stop()
+
+        if self.is_running and not self.stop_requested:
+            logger.log(OK, "Tüm aralıklar tamamlandı.")
             self.app_callbacks['update_status']("Tamamlandı")
         elif self.stop_requested:
-            self.app_callbacks['log_message']("Scraping kullanıcı tarafından durduruldu.", "INFO")
+            logger.info("Scraping kullanıcı tarafından durduruldu.")
             self.app_callbacks['update_status']("Durduruldu")
         
+        self.excel_exporter.save_workbook()
         self.is_running = False
+        await self._wait_for_writes()
+        self.app_callbacks['on_scraping_finished']()
+
+    async def _planned_scraping_loop(self):
+        """_scraping_loop with a fixed page budget per interval, allocated by RequestPlanner."""
+        try:
+            planner = RequestPlanner.from_params(self.query_params, accounts=len(self.client_manager.clients))
+        except ValueError as e:
+            logger.critical("Plan oluşturulamadı: %s", e)
+            self.is_running = False
+            self.app_callbacks['on_scraping_finished']()
+            return
+        for line in planner.report():
+            logger.info("Plan | %s", line)
+
+        if self.expander:
+            self.expander.start()
+        strata = planner.strata()
+        budget = planner.effective_budget()
+        allocation = planner.initial_allocation(budget)
+        states = [None] * len(strata)
+        # A stratum can be visited by both passes; its summary rows are written once, when it is final.
+        running_aggregates = {name: getattr(self, name) for name in self._new_interval_aggregates()}
+        aggregates = [None] * len(strata)
+        spent = 0
+        passes = [("İlk geçiş" if planner.mode == 'stratified' else "Plan", allocation)]
+        for pass_index in range(2):
+            pass_name, pass_allocation = passes[pass_index]
+            final_pass = planner.mode != 'stratified' or pass_index == 1
+            for index, ((since_dt, until_dt), pages) in enumerate(zip(strata, pass_allocation)):
+                if self.stop_requested or not self.is_running:
+                    break
+                if pages <= 0:
+                    if final_pass:
+                        self._flush_stratum_aggregates(aggregates, index, since_dt, until_dt)
+                    continue
+                if len(self.client_manager.clients) > 1 and self.client_manager.rotate():
+                    self.app_callbacks['update_current_account'](self.client_manager.current_identifier)
+                state = states[index] or {'since': since_dt, 'until': until_dt, 'max_id': None, 'page_num': 0, 'collected_in_interval': 0}
+                state.pop('abandoned', None)
+                fetched_before = state.get('pages_fetched', 0)
+                state['page_num'] = fetched_before
+                state['page_limit'] = fetched_before + pages
+                self.current_task_state = state
+                aggregates[index] = aggregates[index] or self._new_interval_aggregates()
+                for name, aggregate in aggregates[index].items():
+                    setattr(self, name, aggregate)
+                self.app_callbacks['update_status'](f"{pass_name} {index + 1}/{len(strata)}: {since_dt:%y-%m-%d %H:%M} ({pages} sayfa)")
+                await self._run_planned_stratum(since_dt, until_dt, f"{pass_index}_{index + 1:04d}_{since_dt:%Y%m%d_%H%M}")
+                states[index] = self.current_task_state
+                if final_pass:
+                    self._flush_stratum_aggregates(aggregates, index, since_dt, until_dt)
+                spent += self.current_task_state.get('pages_fetched', 0) - fetched_before
+                if self.is_running:
+                    await asyncio.sleep(self.query_params.get('request_delay_sec', DEFAULT_REQUEST_DELAY_SEC))
+            if planner.mode != 'stratified' or pass_index == 1 or self.stop_requested or not self.is_running:
+                break
+            observations = [{'collected': state.get('collected_in_interval', 0), 'pages': state.get('pages_fetched', 0),
+                             'oldest_dt': state.get('oldest_dt'), 'exhausted': state.get('exhausted')} if state else None
+                            for state in states]
+            extra, estimates = planner.allocate_remaining(budget - spent, observations)
+            logger.info("Plan | İlk geçiş %d sayfa; tahmini toplam %d tweet; kalan %d sayfa %d saate dağıtıldı.",
+                        spent, int(sum(estimates)), sum(extra), sum(1 for pages in extra if pages))
+            passes.append(("Yoğunluk geçişi", extra))
+        logger.info("Plan | Harcanan: %d/%d sayfa.", spent, budget)
+        # Strata left unfinished by a stop still get their rows.
+        for index, (since_dt, until_dt) in enumerate(strata):
+            self._flush_stratum_aggregates(aggregates, index, since_dt, until_dt)
+        for name, aggregate in running_aggregates.items():
+            setattr(self, name, aggregate)
+
+        if self.is_running and not self.stop_requested:
+            await self._backfill_failed_pages()
+        if self.expander:
+            if self.is_running and not self.stop_requested:
+                await self.expander.drain()
+            await self.expander.stop()
+        if self.is_running and not self.stop_requested:
+            logger.log(OK, "Planlı toplama tamamlandı.")
+            self.app_callbacks['update_status']("Tamamlandı")
+        elif self.stop_requested:
+            logger.info("Scraping kullanıcı tarafından durduruldu.")
+            self.app_callbacks['update_status']("Durduruldu")
         self.excel_exporter.save_workbook()
+        self.is_running = False
+        await self._wait_for_writes()
         self.app_callbacks['on_scraping_finished']()
 
+    def _flush_stratum_aggregates(self, aggregates, index, since_dt, until_dt):
+        if not aggregates[index]:
+            return
+        for name, aggregate in aggregates[index].items():
+            setattr(self, name, aggregate)
+        self._flush_interval_summaries(since_dt, until_dt)
+        aggregates[index] = None
+
+    async def _run_planned_stratum(self, since_dt, until_dt, profile_label):
+        """Collect self.current_task_state's stratum, waiting through pauses and account switches."""
+        while self.is_running and not self.stop_requested:
+            while self.is_paused and self.is_running and not self.stop_requested:
+                await asyncio.sleep(0.5)
+            if self.stop_requested or not self.is_running:
+                return
+            if not self.client_ready_event.is_set():
+                self.app_callbacks['update_status']("Hesap bekleniyor...")
+                await self.client_ready_event.wait()
+                self.is_paused = False
+            try:
+                await self._collect_interval(since_dt, until_dt, profile_label, flush_summaries=False)
+                return
+            except (CriticalClientError, TemporaryClientError) as e:
+                if await self._switch_client_after_error(e):
+                    continue
+                logger.error("Client hatası: %s. Yeni hesap bilgileri gerekiyor.", e)
+                self.is_paused = True
+                self.client_ready_event.clear()
+                self.app_callbacks['request_new_credentials_for_resume'](self.current_task_state)
+            except Exception as e:
+                logger.error("Aralık işlenirken genel hata (%s: %s). Bu aralık atlanıyor.", type(e).__name__, e)
+                return
 
-class App(tk.Tk):
-    def __init__(self):
+    async def run_queue_worker(self, work_queue, worker_id, accounts):
+        """Headless entry point: log in every account into the pool, then work the shared queue."""
+        for credentials in accounts:
+            await self.client_manager.ensure_session(credentials.get('username'), credentials.get('email'), credentials.get('password'))
+        if not self.client_manager.select_client():
+            logger.critical("%s: hiçbir hesapla oturum açılamadı.", worker_id)
+            self.app_callbacks['on_scraping_finished']()
+            return
+        self.client_ready_event.set()
+        self.is_running = True
+        self.app_callbacks['update_current_account'](self.client_manager.current_identifier)
+        await self._queue_worker_loop(work_queue, worker_id)
+
+    async def _queue_worker_loop(self, work_queue, worker_id):
+        lease_sec = self.query_params.get('queue_lease_sec', DEFAULT_QUEUE_LEASE_SEC)
+        heartbeat_sec = self.query_params.get('queue_heartbeat_sec', DEFAULT_QUEUE_HEARTBEAT_SEC)
+        max_attempts = self.query_params.get('queue_max_attempts', DEFAULT_QUEUE_MAX_ATTEMPTS)
+
+        if self.expander:
+            self.expander.start()
+        units_done = 0
+        try:
+            while self.is_running and not self.stop_requested:
+                wait_sec = self.client_manager.seconds_until_available()
+                if wait_sec is None:
+                    logger.error("%s: kullanılabilir hesap kalmadı, işçi duruyor.", worker_id)
+                    break
+                if wait_sec > 0:
+                    logger.warning("Tüm hesapların devresi açık; %.0f saniye bekleniyor.", wait_sec)
+                    await asyncio.sleep(wait_sec)
+                    continue
+                self.client_manager.select_client()
+
+                unit = await asyncio.to_thread(work_queue.claim, worker_id, lease_sec, max_attempts)
+                if unit is None:
+                    leased = (await asyncio.to_thread(work_queue.summary)).get('leased', 0)
+                    if not leased:
+                        break
+                    self.app_callbacks['update_status'](f"Boşta; {leased} birim diğer işçilerde")
+                    await asyncio.sleep(heartbeat_sec)
+                    continue
+                if await self._run_work_unit(work_queue, worker_id, unit, lease_sec, heartbeat_sec):
+                    units_done += 1
+
+            if self.is_running and not self.stop_requested:
+                await self._backfill_failed_pages()
+            if self.expander:
+                if self.is_running and not self.stop_requested:
+                    await self.expander.drain()
+                await self.expander.stop()
+        finally:
+            self.excel_exporter.save_workbook()
+            self.is_running = False
+            await self._wait_for_writes()
+            logger.log(OK, "%s bitti: %d birim tamamlandı. Kuyruk durumu: %s", worker_id, units_done, work_queue.summary())
+            self.app_callbacks['on_scraping_finished']()
+
+    async def _run_work_unit(self, work_queue, worker_id, unit, lease_sec, heartbeat_sec):
+        """Collect one leased unit interval by interval; it is marked done only after its rows are on disk."""
+        interval_hours = self.query_params.get('interval_hours', DEFAULT_INTERVAL_HOURS)
+        request_delay_sec = self.query_params.get('request_delay_sec', DEFAULT_REQUEST_DELAY_SEC)
+        unit_since = datetime.strptime(unit['since'], '%Y-%m-%d %H:%M:%S')
+        unit_until = datetime.strptime(unit['until'], '%Y-%m-%d %H:%M:%S')
+        lease_lost = asyncio.Event()
+
+        async def keep_lease():
+            while True:
+                await asyncio.sleep(heartbeat_sec)
+                if not await asyncio.to_thread(work_queue.heartbeat, unit['id'], worker_id, lease_sec):
+                    logger.warning("Birim %s–%s başka bir işçiye geçti; bırakılıyor.", unit['since'], unit['until'])
+                    lease_lost.set()
+                    return
+
+        logger.info("Birim alındı: %s–%s (deneme %d).", unit['since'], unit['until'], unit['attempts'])
+        heartbeat_task = asyncio.create_task(keep_lease())
+        collected = 0
+        current_dt = unit_since
+        finished = False
+        try:
+            while current_dt < unit_until and self.is_running and not self.stop_requested and not lease_lost.is_set():
+                since_dt = current_dt
+                until_dt = min(current_dt + timedelta(hours=interval_hours), unit_until)
+                if not (self.current_task_state and self.current_task_state.get('since') == since_dt and self.current_task_state.get('until') == until_dt):
+                    self.current_task_state = {'since': since_dt, 'until': until_dt, 'max_id': None, 'page_num': 0, 'collected_in_interval': 0}
+                self.app_callbacks['update_status'](f"{since_dt:%y-%m-%d %H:%M} - {until_dt:%y-%m-%d %H:%M}")
+                try:
+                    collected += await self._collect_interval(since_dt, until_dt, f"{since_dt:%Y%m%d_%H%M}")
+                except (CriticalClientError, TemporaryClientError) as e:
+                    if await self._switch_client_after_error(e):
+                        continue
+                    logger.error("Client hatası: %s. Birim kuyruğa geri bırakılıyor.", e)
+                    break
+                except Exception as e:
+                    logger.error("Aralık işlenirken genel hata (%s: %s). Bu aralık atlanıyor.", type(e).__name__, e)
+                current_dt = until_dt
+                self.current_task_state = None
+                if current_dt < unit_until and self.is_running:
+                    await asyncio.sleep(request_delay_sec)
+            finished = current_dt >= unit_until and not lease_lost.is_set()
+            if finished:
+                self.excel_exporter.save_workbook()
+                await self._wait_for_writes()
+                finished = await asyncio.to_thread(work_queue.complete, unit['id'], worker_id, collected)
+                if finished:
+                    logger.log(OK, "Birim tamamlandı: %s–%s, %d tweet.", unit['since'], unit['until'], collected)
+        finally:
+            heartbeat_task.cancel()
+            if not finished and not lease_lost.is_set():
+                work_queue.release(unit['id'], worker_id, "işçi birimi bitiremedi")
+        return finished
+
+
+class AppWindow:
+    """Main window of App; load_gui() puts it on top of tk.Tk."""
+
+    def __init__(self, profile=False, log_level=DEFAULT_LOG_LEVEL):
         super().__init__()
         self.title("Twitter Scraper GUI")
         self.geometry("1000x750") 
@@ -587,9 +2953,13 @@ class App(tk.Tk):
         self.query_params = {}
         self.scraper = None
         self.credentials_dialog_open = False
+        self.file_log_sink = None
+        self.default_log_level = log_level
+        set_log_level(log_level)
+        self.log_handler = CallbackLogHandler(self.log_message)
+        logger.addHandler(self.log_handler)
 
         self.callbacks = {
-            'log_message': self.log_message,
             'update_status': self.update_status,
             'update_current_account': self.update_current_account,
             'update_excel_tweets_count': self.update_excel_tweets_count,
@@ -601,8 +2971,24 @@ class App(tk.Tk):
         self.keyword_entry_var = tk.StringVar()
         self.min_retweets_var = tk.StringVar(value="0")
         self.min_faves_var = tk.StringVar(value="0")
-
-        self.init_query_builder_ui()
+        self.profile_var = tk.BooleanVar(value=profile)
+        self.fetch_missing_profiles_var = tk.BooleanVar(value=True)
+        self.interval_summary_var = tk.BooleanVar(value=True)
+        self.tweet_store_var = tk.BooleanVar(value=False)
+        self.search_store = None
+
+        # Panels are built on first use; the query builder waits for the
+        # empty window's first Expose so the first paint is not delayed.
+        self._first_expose_seen = False
+        self.bind('<Expose>', self._on_first_expose, add='+')
+        # A window opened withdrawn or minimized gets no Expose; the builder is then made on a timer.
+        self.after(500, self._on_first_expose)
+
+    def _on_first_expose(self, event=None):
+        if (event is None or event.widget is self) and not self._first_expose_seen:
+            self._first_expose_seen = True
+            # A timer rather than after_idle, so Tk's idle redraw of the exposed window runs first.
+            self.after(1, self.show_query_builder)
 
     def log_message(self, msg, level="INFO"):
         if hasattr(self, 'log_text_widget'): 
@@ -610,8 +2996,6 @@ class App(tk.Tk):
             formatted_msg = f"{log_time} | {level:<7} | {msg}\n"
             self.log_text_widget.insert(tk.END, formatted_msg)
             self.log_text_widget.see(tk.END)
-            if level in ["ERROR", "CRITICAL", "WARN"]:
-                 print(formatted_msg.strip()) 
 
     def update_status(self, status_msg):
         if hasattr(self, 'status_label'):
@@ -664,6 +3048,23 @@ class App(tk.Tk):
     def _add_filter_keyword(self, filter_text):
         self._add_to_keyword_query(filter_text, needs_space_after=True)
 
+    def show_query_builder(self):
+        if hasattr(self, 'main_app_frame') and self.main_app_frame.winfo_exists():
+            self.main_app_frame.pack_forget()
+        if hasattr(self, 'query_frame') and self.query_frame.winfo_exists():
+            self.query_frame.pack(expand=True, fill=tk.BOTH)
+        else:
+            self.init_query_builder_ui()
+
+    def show_main_app_ui(self):
+        if hasattr(self, 'query_frame') and self.query_frame.winfo_exists():
+            self.query_frame.pack_forget()
+        if hasattr(self, 'main_app_frame') and self.main_app_frame.winfo_exists():
+            self.main_app_frame.pack(expand=True, fill=tk.BOTH)
+            self.update_gui_for_scraping_active(False)
+        else:
+            self.init_main_app_ui()
+
     def init_query_builder_ui(self):
         self.query_frame = ttk.Frame(self, padding="10")
         self.query_frame.pack(expand=True, fill=tk.BOTH)
@@ -757,8 +3158,29 @@ class App(tk.Tk):
             ("Sayfa Başına Tweet (API)", "search_page_size", str(DEFAULT_SEARCH_PAGE_SIZE), 5),
             ("Aralık Adımı (saat)", "interval_hours", str(DEFAULT_INTERVAL_HOURS), 5),
             ("Excel Dosya Adı", "excel_file", DEFAULT_EXCEL_FILE, 30),
+            ("Log Seviyesi", "log_level", self.default_log_level, 12, LOG_LEVEL_NAMES),
             ("İstekler Arası Gecikme (sn)", "request_delay_sec", str(DEFAULT_REQUEST_DELAY_SEC), 5),
             ("Sayfa İstekleri Arası Gecikme (sn)", "page_request_delay_sec", str(DEFAULT_PAGE_REQUEST_DELAY_SEC), 5),
+            ("Rate Limit Deneme Hakkı", "retry_budget_rate_limit", str(DEFAULT_RETRY_BUDGETS['rate_limit']), 5),
+            ("Ağ Hatası Deneme Hakkı", "retry_budget_network", str(DEFAULT_RETRY_BUDGETS['network']), 5),
+            ("Twitter Hatası Deneme Hakkı", "retry_budget_twitter", str(DEFAULT_RETRY_BUDGETS['twitter']), 5),
+            ("Hesap Devre Eşiği (ardışık hata)", "breaker_failure_threshold", str(DEFAULT_BREAKER_FAILURE_THRESHOLD), 5),
+            ("Hesap Devre Bekleme (sn)", "breaker_cooldown_sec", str(DEFAULT_BREAKER_COOLDOWN_SEC), 5),
+            ("Dakika Başına İstek (hesap başı)", "requests_per_minute", str(DEFAULT_REQUESTS_PER_MINUTE), 5),
+            ("Yanıtları Genişlet: Min RT (0=kapalı)", "expand_min_retweets", "0", 5),
+            ("Yanıtları Genişlet: Min Beğeni (0=kapalı)", "expand_min_faves", "0", 5),
+            ("Yanıt Genişletme İşçi Sayısı", "expand_workers", str(DEFAULT_EXPAND_WORKERS), 5),
+            ("Güncelleme Önceliği: Yaş (saat)", "refresh_priority_age_hours", str(DEFAULT_REFRESH_PRIORITY_AGE_HOURS), 5),
+            ("Güncelleme Modu", "refresh_mode", DEFAULT_REFRESH_MODE, 10, ["inplace", "delta"]),
+            ("Aralık Başına Öne Çıkan Varlık (0=kapalı)", "entity_top_n", str(DEFAULT_ENTITY_TOP_N), 5),
+            ("Aralık Özeti: En Aktif Kullanıcı Sayısı", "summary_top_users", str(DEFAULT_SUMMARY_TOP_USERS), 5),
+            ("Yakın Kopya Tespiti", "near_dup_mode", DEFAULT_NEAR_DUP_MODE, 10, list(NearDuplicateIndex.MODES)),
+            ("Bütçe Planlama Modu", "plan_mode", DEFAULT_PLAN_MODE, 12, list(RequestPlanner.MODES)),
+            ("Toplam İstek Bütçesi (sayfa)", "plan_budget_pages", str(DEFAULT_PLAN_BUDGET_PAGES), 7),
+            ("Son Tarih (YYYY-MM-DD HH:MM:SS, boş=yok)", "plan_deadline", "", 20),
+            ("Saat Başına En Az Sayfa (stratified)", "plan_min_pages", str(DEFAULT_PLAN_MIN_PAGES), 5),
+            ("Otomatik Kayıt (satır, 0=kapalı)", "autosave_rows", str(DEFAULT_AUTOSAVE_ROWS), 5),
+            ("Otomatik Kayıt (sn, 0=kapalı)", "autosave_sec", str(DEFAULT_AUTOSAVE_SEC), 5),
         ]
 
         for i, item in enumerate(other_params_config):
@@ -773,19 +3195,29 @@ class App(tk.Tk):
             else: 
                 ttk.Entry(other_params_frame, textvariable=var, width=width).grid(row=i, column=1, sticky=tk.EW, padx=5, pady=2)
         
+        ttk.Checkbutton(other_params_frame, text="Profil Modu (cProfile/tracemalloc)", variable=self.profile_var).grid(row=len(other_params_config), column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
+        ttk.Checkbutton(other_params_frame, text="Eksik Kullanıcı Profillerini Çek (ek istek)", variable=self.fetch_missing_profiles_var).grid(row=len(other_params_config) + 1, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
+        ttk.Checkbutton(other_params_frame, text="Aranabilir SQLite Deposu (FTS5)", variable=self.tweet_store_var).grid(row=len(other_params_config) + 2, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
+        ttk.Checkbutton(other_params_frame, text="Aralık Özeti Sayfası", variable=self.interval_summary_var).grid(row=len(other_params_config) + 3, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
         other_params_frame.grid_columnconfigure(1, weight=1)
         
-        ttk.Button(self.query_frame, text="Yapılandır ve Başlat", command=self.start_scraping_with_params).pack(pady=15, side=tk.BOTTOM)
+        start_buttons_frame = ttk.Frame(self.query_frame)
+        start_buttons_frame.pack(pady=15, side=tk.BOTTOM)
+        ttk.Button(start_buttons_frame, text="Yapılandır ve Başlat", command=self.start_scraping_with_params).pack(side=tk.LEFT, padx=5)
+        ttk.Button(start_buttons_frame, text="Etkileşimleri Güncelle", command=lambda: self.start_scraping_with_params(mode='refresh')).pack(side=tk.LEFT, padx=5)
+        ttk.Button(start_buttons_frame, text="Planı Göster", command=self.show_plan_preview).pack(side=tk.LEFT, padx=5)
+        ttk.Button(start_buttons_frame, text="Sonuçlarda Ara", command=self.show_search_tab).pack(side=tk.LEFT, padx=5)
 
 
-    def start_scraping_with_params(self):
-        self.query_params = {} 
+    def _read_query_params(self, mode='scrape'):
+        """Validated parameters from the query builder, or None after showing what is wrong."""
+        query_params = {'mode': mode}
         
         keywords_query = self.constructed_keywords_var.get().strip()
         if not keywords_query:
             messagebox.showerror("Parametre Hatası", "Lütfen anahtar kelime sorgusu oluşturun.")
-            return
-        self.query_params['keywords'] = keywords_query
+            return None
+        query_params['keywords'] = keywords_query
 
         try:
             start_dt_str_parts = {}
@@ -794,8 +3226,8 @@ class App(tk.Tk):
                 if not val or not val.isdigit(): 
                     raise ValueError(f"Başlangıç tarihi '{part_key}' kısmı sayısal değil veya boş: '{val}'")
                 start_dt_str_parts[part_key] = val
-            self.query_params['start_dt'] = f"{start_dt_str_parts['Y']}-{start_dt_str_parts['M']}-{start_dt_str_parts['D']} {start_dt_str_parts['h']}:{start_dt_str_parts['m']}:{start_dt_str_parts['s']}"
-            datetime.strptime(self.query_params['start_dt'], '%Y-%m-%d %H:%M:%S')
+            query_params['start_dt'] = f"{start_dt_str_parts['Y']}-{start_dt_str_parts['M']}-{start_dt_str_parts['D']} {start_dt_str_parts['h']}:{start_dt_str_parts['m']}:{start_dt_str_parts['s']}"
+            datetime.strptime(query_params['start_dt'], '%Y-%m-%d %H:%M:%S')
 
             end_dt_str_parts = {}
             for part_key in ["Y", "M", "D", "h", "m", "s"]:
@@ -803,33 +3235,60 @@ class App(tk.Tk):
                 if not val or not val.isdigit():
                     raise ValueError(f"Bitiş tarihi '{part_key}' kısmı sayısal değil veya boş: '{val}'")
                 end_dt_str_parts[part_key] = val
-            self.query_params['end_dt'] = f"{end_dt_str_parts['Y']}-{end_dt_str_parts['M']}-{end_dt_str_parts['D']} {end_dt_str_parts['h']}:{end_dt_str_parts['m']}:{end_dt_str_parts['s']}"
-            datetime.strptime(self.query_params['end_dt'], '%Y-%m-%d %H:%M:%S')
+            query_params['end_dt'] = f"{end_dt_str_parts['Y']}-{end_dt_str_parts['M']}-{end_dt_str_parts['D']} {end_dt_str_parts['h']}:{end_dt_str_parts['m']}:{end_dt_str_parts['s']}"
+            datetime.strptime(query_params['end_dt'], '%Y-%m-%d %H:%M:%S')
 
         except ValueError as e_val: 
             messagebox.showerror("Tarih/Saat Hatası", f"Lütfen tüm tarih ve saat alanlarını doğru ve sayısal olarak doldurun.\nDetay: {e_val}")
-            return
+            return None
         except KeyError as e_key: 
             messagebox.showerror("Program Hatası", f"Tarih parametresi anahtarı bulunamadı: {e_key}")
-            return
+            return None
 
         try:
-            for key in ["lang", "product", "excel_file"]: 
-                 self.query_params[key] = self.q_params_vars[key].get()
+            for key in ["lang", "product", "excel_file", "log_level", "refresh_mode", "plan_mode", "plan_deadline", "near_dup_mode"]: 
+                 query_params[key] = self.q_params_vars[key].get()
 
             for key in ["tweets_per_interval", "search_page_size", "interval_hours", 
-                        "request_delay_sec", "page_request_delay_sec"]: 
-                self.query_params[key] = int(self.q_params_vars[key].get())
+                        "request_delay_sec", "page_request_delay_sec", "retry_budget_rate_limit", "retry_budget_network",
+                        "retry_budget_twitter", "breaker_failure_threshold", "breaker_cooldown_sec", "requests_per_minute",
+                        "expand_min_retweets", "expand_min_faves", "expand_workers", "refresh_priority_age_hours",
+                        "entity_top_n", "summary_top_users", "plan_budget_pages", "plan_min_pages", "autosave_rows", "autosave_sec"]: 
+                query_params[key] = int(self.q_params_vars[key].get())
         except ValueError as e:
             messagebox.showerror("Parametre Hatası", f"Lütfen sayısal alanları doğru formatta girin.\nHata: {e}")
-            return
+            return None
         except KeyError as e:
             messagebox.showerror("Parametre Hatası", f"Eksik parametre yapılandırması: {e}")
+            return None
+        query_params['profile'] = self.profile_var.get()
+        query_params['fetch_missing_profiles'] = self.fetch_missing_profiles_var.get()
+        query_params['tweet_store'] = self.tweet_store_var.get()
+        query_params['interval_summary'] = self.interval_summary_var.get()
+        return query_params
+
+    def start_scraping_with_params(self, mode='scrape'):
+        query_params = self._read_query_params(mode)
+        if query_params is None:
             return
+        self.query_params = query_params
+        set_log_level(self.query_params['log_level'])
+        self.start_file_log(os.path.splitext(self.query_params['excel_file'])[0] + "_log.jsonl")
 
-        self.query_frame.pack_forget()
-        self.init_main_app_ui()
+        self.show_main_app_ui()
         self.prompt_initial_credentials()
+
+    def show_plan_preview(self):
+        query_params = self._read_query_params()
+        if query_params is None:
+            return
+        try:
+            # Same account count the run plans with: the GUI run starts with one logged-in account.
+            planner = RequestPlanner.from_params(query_params, accounts=1)
+        except ValueError as e:
+            messagebox.showerror("Plan Hatası", str(e))
+            return
+        messagebox.showinfo("İstek Bütçesi Planı", "\n".join(planner.report()))
         
     def prompt_initial_credentials(self):
         if self.credentials_dialog_open: return
@@ -840,9 +3299,7 @@ class App(tk.Tk):
             creds = dialog.result
             if not creds['username'] or not creds['password']:
                 messagebox.showerror("Eksik Bilgi", "Kullanıcı adı ve şifre gereklidir.")
-                if hasattr(self, 'main_app_frame') and self.main_app_frame.winfo_exists():
-                    self.main_app_frame.pack_forget()
-                self.init_query_builder_ui() 
+                self.show_query_builder()
                 return
             
             self.scraper = TwitterScraper(self.callbacks, self.query_params)
@@ -850,9 +3307,7 @@ class App(tk.Tk):
             self.update_gui_for_scraping_active(True)
         else: 
             messagebox.showinfo("İptal Edildi", "Scraping başlatılmadı.")
-            if hasattr(self, 'main_app_frame') and self.main_app_frame.winfo_exists():
-                 self.main_app_frame.pack_forget()
-            self.init_query_builder_ui()
+            self.show_query_builder()
 
 
     def init_main_app_ui(self):
@@ -878,25 +3333,155 @@ class App(tk.Tk):
 
         self.save_button = ttk.Button(control_panel, text="Mevcut Veriyi Kaydet", command=self.handle_save_button)
         self.save_button.pack(pady=5, fill=tk.X)
+
+        ttk.Checkbutton(control_panel, text="Profil Modu", variable=self.profile_var, command=self.handle_profile_toggle).pack(pady=5, anchor=tk.W)
         
         self.stop_button = ttk.Button(control_panel, text="Durdur ve Çık", command=self.handle_stop_button)
         self.stop_button.pack(pady=10, side=tk.BOTTOM, fill=tk.X)
+        self.back_button = ttk.Button(control_panel, text="Ana Menüye Dön", command=self.show_query_builder)
+        self.back_button.pack(pady=5, side=tk.BOTTOM, fill=tk.X)
 
-        log_panel = ttk.Frame(self.main_app_frame, relief=tk.RIDGE, padding="5")
-        log_panel.pack(side=tk.RIGHT, expand=True, fill=tk.BOTH, padx=5, pady=5)
-        
-        ttk.Label(log_panel, text="İşlem Kayıtları", font=("Arial", 12)).pack(pady=5)
+        self.main_notebook = ttk.Notebook(self.main_app_frame)
+        self.main_notebook.pack(side=tk.RIGHT, expand=True, fill=tk.BOTH, padx=5, pady=5)
+
+        log_panel = ttk.Frame(self.main_notebook, padding="5")
+        self.main_notebook.add(log_panel, text="İşlem Kayıtları")
         self.log_text_widget = scrolledtext.ScrolledText(log_panel, wrap=tk.WORD, height=10, width=70, font=("Courier New", 9))
         self.log_text_widget.pack(expand=True, fill=tk.BOTH)
+
+        # The search tab is built when first selected.
+        self.search_panel = ttk.Frame(self.main_notebook, padding="5")
+        self.main_notebook.add(self.search_panel, text="Arama")
+        self.main_notebook.bind("<<NotebookTabChanged>>", self._on_main_tab_changed)
         self.update_gui_for_scraping_active(False) 
 
+    def show_search_tab(self):
+        self.show_main_app_ui()
+        self.main_notebook.select(self.search_panel)
+
+    def _on_main_tab_changed(self, event=None):
+        if self.main_notebook.select() == str(self.search_panel) and not hasattr(self, 'search_tree'):
+            self.init_search_ui()
+
+    def _search_output_file(self):
+        if self.query_params.get('excel_file'):
+            return self.query_params['excel_file']
+        if hasattr(self, 'q_params_vars') and 'excel_file' in self.q_params_vars:
+            return self.q_params_vars['excel_file'].get()
+        return DEFAULT_EXCEL_FILE
+
+    def init_search_ui(self):
+        panel = self.search_panel
+        filters = ttk.Frame(panel)
+        filters.pack(fill=tk.X, pady=(0, 5))
+        self.search_vars = {key: tk.StringVar() for key in ("text", "user", "date_from", "date_to")}
+        self.search_vars['order'] = tk.StringVar(value="Tarih")
+        for col, (label, key, width) in enumerate([("Metin", "text", 28), ("Kullanıcı", "user", 14),
+                                                   ("Başlangıç", "date_from", 11), ("Bitiş", "date_to", 11)]):
+            ttk.Label(filters, text=label + ":").grid(row=0, column=col * 2, sticky=tk.W, padx=(5, 0))
+            entry = ttk.Entry(filters, textvariable=self.search_vars[key], width=width)
+            entry.grid(row=0, column=col * 2 + 1, sticky=tk.EW, padx=(0, 5))
+            entry.bind("<Return>", lambda e: self.run_search())
+        ttk.Combobox(filters, textvariable=self.search_vars['order'], values=["Tarih", "Etkileşim", "İlgililik"],
+                     width=9, state="readonly").grid(row=0, column=8, padx=5)
+        ttk.Button(filters, text="Ara", command=self.run_search).grid(row=0, column=9, padx=5)
+        filters.grid_columnconfigure(1, weight=1)
+
+        columns = ("date", "user", "rt", "likes", "text")
+        self.search_tree = ttk.Treeview(panel, columns=columns, show="headings")
+        for column, heading, width, stretch in [("date", "Tarih", 130, False), ("user", "Kullanıcı", 110, False),
+                                                ("rt", "RT", 50, False), ("likes", "Likes", 50, False), ("text", "Tweet", 400, True)]:
+            self.search_tree.heading(column, text=heading)
+            self.search_tree.column(column, width=width, stretch=stretch, anchor=tk.W)
+        tree_scroll = ttk.Scrollbar(panel, orient="vertical", command=self.search_tree.yview)
+        self.search_tree.configure(yscrollcommand=tree_scroll.set)
+
+        pager = ttk.Frame(panel)
+        pager.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        self.search_prev_button = ttk.Button(pager, text="◀ Önceki", command=lambda: self.run_search(page_delta=-1), state=tk.DISABLED)
+        self.search_prev_button.pack(side=tk.LEFT)
+        self.search_next_button = ttk.Button(pager, text="Sonraki ▶", command=lambda: self.run_search(page_delta=1), state=tk.DISABLED)
+        self.search_next_button.pack(side=tk.LEFT, padx=5)
+        self.search_info_label = ttk.Label(pager, text="")
+        self.search_info_label.pack(side=tk.LEFT, padx=10)
+        ttk.Button(pager, text="Excel'den İçe Aktar", command=self.handle_search_import).pack(side=tk.RIGHT)
+
+        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_tree.pack(expand=True, fill=tk.BOTH)
+        # Cursors of the pages seen so far; the last one is the next page's.
+        self.search_cursors = [None]
+        self.search_next_cursor = None
+
+    def _open_search_store(self):
+        path = TweetStore.path_for(self._search_output_file())
+        if self.search_store is None or self.search_store.path != path:
+            if self.search_store:
+                self.search_store.close()
+            self.search_store = TweetStore(path)
+        return self.search_store
+
+    def run_search(self, page_delta=0):
+        if page_delta > 0 and self.search_next_cursor is not None:
+            self.search_cursors.append(self.search_next_cursor)
+        elif page_delta < 0 and len(self.search_cursors) > 1:
+            self.search_cursors.pop()
+        elif page_delta == 0:
+            self.search_cursors = [None]
+        order = {"Tarih": 'date', "Etkileşim": 'engagement', "İlgililik": 'relevance'}[self.search_vars['order'].get()]
+        started = time.perf_counter()
+        try:
+            rows, self.search_next_cursor = self._open_search_store().search(
+                text=self.search_vars['text'].get(), user=self.search_vars['user'].get(),
+                date_from=self.search_vars['date_from'].get().strip() or None, date_to=self.search_vars['date_to'].get().strip() or None,
+                order=order, after=self.search_cursors[-1])
+        except Exception as e:
+            messagebox.showerror("Arama Hatası", f"{type(e).__name__}: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.search_tree.delete(*self.search_tree.get_children())
+        for _, date, screen_name, user_name, rt, likes, text, tweet_id in rows:
+            self.search_tree.insert("", tk.END, iid=tweet_id, values=(date, screen_name or user_name, rt, likes, (text or "").replace("\n", " ")))
+        page = len(self.search_cursors)
+        self.search_info_label.config(text=f"Sayfa {page} · {len(rows)} sonuç · {elapsed_ms:.0f} ms")
+        self.search_prev_button.config(state=tk.NORMAL if page > 1 else tk.DISABLED)
+        self.search_next_button.config(state=tk.NORMAL if self.search_next_cursor is not None else tk.DISABLED)
+
+    def handle_search_import(self):
+        output_file = self._search_output_file()
+        if not os.path.exists(output_file):
+            messagebox.showerror("Dosya Yok", f"'{output_file}' bulunamadı.")
+            return
+        self.search_info_label.config(text="İçe aktarılıyor...")
+
+        def failed(message):
+            self.search_info_label.config(text="İçe aktarma başarısız.")
+            messagebox.showerror("İçe Aktarma Hatası", message)
+
+        def work():
+            try:
+                store = TweetStore(TweetStore.path_for(output_file))
+                try:
+                    exporter = ExcelExporter(output_file, {'update_excel_tweets_count': lambda count: None}, autosave_rows=0, autosave_sec=0)
+                    added = store.add_rows(exporter.rows)
+                    logger.log(OK, "'%s' deposuna %d yeni tweet aktarıldı (toplam %d).", store.path, added, store.count())
+                finally:
+                    store.close()
+            except Exception as e:
+                logger.error("İçe aktarma hatası (%s): %s", output_file, e)
+                message = f"{type(e).__name__}: {e}"
+                self.after(0, lambda: failed(message))
+                return
+            self.after(0, self.run_search)
+
+        threading.Thread(target=work, daemon=True, name="store-import").start()
+
     def handle_request_new_credentials(self, resume_state_info):
         if self.credentials_dialog_open:
-            self.log_message("Credential dialog zaten açık.", "WARN")
+            logger.warning("Credential dialog zaten açık.")
             return
         self.credentials_dialog_open = True
         
-        self.log_message("Yeni hesap bilgileri gerekiyor. Lütfen girin.", "USER_INPUT")
+        logger.log(USER_INPUT, "Yeni hesap bilgileri gerekiyor. Lütfen girin.")
         dialog = CredentialsDialog(self, title="Hesap Değişikliği/Sorunu")
         self.credentials_dialog_open = False
 
@@ -913,9 +3498,9 @@ class App(tk.Tk):
                     self.scraper.loop
                 )
             else:
-                self.log_message("Scraper loop aktif değil. Hesap değiştirilemiyor.", "ERROR")
+                logger.error("Scraper loop aktif değil. Hesap değiştirilemiyor.")
         else: 
-            self.log_message("Hesap değişikliği iptal edildi. Scraping duraklatıldı.", "WARN")
+            logger.warning("Hesap değişikliği iptal edildi. Scraping duraklatıldı.")
             self.update_status("Hesap bilgisi bekleniyor (İptal Edildi)")
 
     def toggle_pause_resume(self):
@@ -931,7 +3516,7 @@ class App(tk.Tk):
 
     def handle_switch_account_button(self):
         if not self.scraper : 
-            self.log_message("Scraper aktif değil.", "WARN")
+            logger.warning("Scraper aktif değil.")
             return
         
         current_state_to_resume = self.scraper.current_task_state
@@ -942,6 +3527,12 @@ class App(tk.Tk):
 
         self.handle_request_new_credentials(current_state_to_resume)
 
+    def handle_profile_toggle(self):
+        enabled = self.profile_var.get()
+        if self.scraper:
+            self.scraper.profiler.set_enabled(enabled)
+        logger.info("Profil modu %s (sonraki aralıktan itibaren).", 'açıldı' if enabled else 'kapatıldı')
+
     def handle_save_button(self):
         if self.scraper:
             self.scraper.save_current_data()
@@ -955,15 +3546,13 @@ class App(tk.Tk):
 
 
     def on_scraping_operation_finished(self):
-        self.log_message("Scraping operasyonu sonlandı.", "INFO")
+        logger.info("Scraping operasyonu sonlandı.")
         self.update_gui_for_scraping_active(False)
         if hasattr(self, 'pause_resume_button'): self.pause_resume_button.config(text="Duraklat")
         if hasattr(self, 'status_label'): self.update_status("Bitti/Durduruldu")
         
         if messagebox.askyesno("İşlem Bitti", "Scraping tamamlandı veya durduruldu.\nAna menüye dönmek ister misiniz? (Hayır = Uygulamayı Kapat)"):
-            if hasattr(self, 'main_app_frame') and self.main_app_frame.winfo_exists():
-                 self.main_app_frame.pack_forget()
-            self.init_query_builder_ui()
+            self.show_query_builder()
         else:
             self.destroy()
 
@@ -981,7 +3570,40 @@ class App(tk.Tk):
 
         if hasattr(self, 'save_button'): self.save_button.config(state=save_btn_state)
         if hasattr(self, 'stop_button'): self.stop_button.config(text="Durdur ve Çık" if is_active else "Çıkış")
+        if hasattr(self, 'back_button'): self.back_button.config(state=tk.DISABLED if is_active else tk.NORMAL)
+
 
+    def start_file_log(self, path):
+        if self.file_log_sink and self.file_log_sink.path == path:
+            return
+        self.stop_file_log()
+        self.file_log_sink = FileLogSink(path)
+        self.file_log_sink.start()
+
+    def stop_file_log(self):
+        if self.file_log_sink:
+            self.file_log_sink.stop()
+            self.file_log_sink = None
+
+    def destroy(self):
+        if self.scraper and not self._wait_for_final_save(DEFAULT_SAVE_WAIT_ON_EXIT_SEC):
+            logger.warning("Arka plan Excel kaydı zamanında bitmedi.")
+        if self.search_store:
+            self.search_store.close()
+        self.stop_file_log()
+        logger.removeHandler(self.log_handler)
+        super().destroy()
+
+    def _wait_for_final_save(self, timeout):
+        # Tk events keep being processed while waiting: log records from the scraper and
+        # save threads are delivered to this thread and would otherwise block them.
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.scraper.is_running and self.scraper.excel_exporter.wait_for_saves(timeout=0.05) \
+                    and self.scraper.disk_writer.flush(timeout=0.05):
+                return True
+            self.update()
+        return False
 
     def on_closing(self):
         if self.scraper and self.scraper.is_running:
@@ -994,7 +3616,242 @@ class App(tk.Tk):
             self.destroy()
 
 
+def load_gui():
+    """Import tkinter and build the window classes on it; returns App."""
+    global tk, ttk, scrolledtext, messagebox, simpledialog, App, CredentialsDialog
+    if App is None:
+        import tkinter as tk
+        from tkinter import ttk, scrolledtext, messagebox, simpledialog
+
+        CredentialsDialog = type('CredentialsDialog', (CredentialsForm, simpledialog.Dialog), {})
+        App = type('App', (AppWindow, tk.Tk), {})
+    return App
+
+
+def run_startup_benchmark(repeats=5):
+    import subprocess
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    module_name = os.path.splitext(os.path.basename(__file__))[0]
+    import_times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module_name}"], cwd=script_dir, check=True)
+        import_times.append(time.perf_counter() - t0)
+
+    marks = {}
+    t0 = time.perf_counter()
+    app = load_gui()()
+    app.bind('<Expose>', lambda event: marks.setdefault('first_paint', time.perf_counter() - t0), add='+')
+    deadline = time.monotonic() + 10
+    while not hasattr(app, 'query_frame') and time.monotonic() < deadline:
+        app.update()
+    query_builder_ready = time.perf_counter() - t0
+    app.destroy()
+
+    print(f"Import (soğuk, {repeats} tekrar): min {min(import_times)*1000:.1f} ms, ortalama {sum(import_times)/len(import_times)*1000:.1f} ms")
+    if 'first_paint' in marks:
+        print(f"İlk çizim (ilk Expose): {marks['first_paint']*1000:.1f} ms")
+    else:
+        print("İlk çizim: Expose olayı gelmedi.")
+    print(f"Sorgu oluşturucu hazır: {query_builder_ready*1000:.1f} ms")
+
+
+def headless_callbacks(worker_id):
+    """The App callback set for runs without a window: everything goes to the logger."""
+    return {
+        'update_status': lambda status: logger.debug("%s durum: %s", worker_id, status),
+        'update_current_account': lambda account: logger.info("%s aktif hesap: %s", worker_id, account),
+        'update_excel_tweets_count': lambda count: None,
+        'request_new_credentials_for_resume': lambda state: logger.error("%s: yeni hesap bilgisi istenemez (arayüz yok).", worker_id),
+        'on_scraping_finished': lambda: None,
+    }
+
+
+def start_console_log(prefix):
+    def write(msg, level):
+        print(f"{datetime.now():%H:%M:%S} | {prefix} | {level:<7} | {msg}", file=sys.stderr, flush=True)
+    handler = CallbackLogHandler(write)
+    logger.addHandler(handler)
+    return handler
+
+
+def init_work_queue(queue_path, query_params, unit_hours=DEFAULT_QUEUE_UNIT_HOURS):
+    work_queue = WorkQueue(queue_path)
+    try:
+        added = work_queue.create(query_params, unit_hours)
+        logger.log(OK, "'%s': %d yeni iş birimi eklendi (%s saatlik). Durum: %s", queue_path, added, unit_hours, work_queue.summary())
+    finally:
+        work_queue.close()
+
+
+def run_queue_worker(queue_path, worker_id, accounts, log_level=DEFAULT_LOG_LEVEL):
+    """One worker process: claims units from the queue and writes `<queue>_parts/<worker_id>.xlsx`."""
+    import socket
+
+    set_log_level(log_level)
+    console_handler = start_console_log(worker_id)
+    work_queue = WorkQueue(queue_path)
+    query_params = work_queue.query_params()
+    if query_params is None:
+        logger.critical("'%s' kuyruğu boş; önce --init-queue ile oluşturun.", queue_path)
+        work_queue.close()
+        return
+    os.makedirs(work_queue.parts_dir, exist_ok=True)
+    part_base = os.path.join(work_queue.parts_dir, worker_id)
+    query_params = dict(query_params, mode='worker', excel_file=part_base + ".xlsx")
+    # SQLite WAL files must not be shared across hosts, so the profile cache is per host.
+    query_params.setdefault('profile_cache_file', os.path.join(work_queue.parts_dir, f"profiles_{socket.gethostname()}.sqlite3"))
+    file_log_sink = FileLogSink(part_base + "_log.jsonl")
+    file_log_sink.start()
+    scraper = TwitterScraper(headless_callbacks(worker_id), query_params)
+    try:
+        asyncio.run(scraper.run_queue_worker(work_queue, worker_id, accounts))
+    except KeyboardInterrupt:
+        logger.info("%s kullanıcı tarafından durduruldu.", worker_id)
+    finally:
+        scraper.excel_exporter.wait_for_saves(timeout=DEFAULT_SAVE_WAIT_ON_EXIT_SEC)
+        scraper.close_stores(timeout=DEFAULT_SAVE_WAIT_ON_EXIT_SEC)
+        work_queue.close()
+        file_log_sink.stop()
+        logger.removeHandler(console_handler)
+
+
+def run_queue_workers(queue_path, worker_id, accounts, processes=1, log_level=DEFAULT_LOG_LEVEL):
+    """Start `processes` local workers, each with its own share of `accounts`."""
+    if processes <= 1:
+        run_queue_worker(queue_path, worker_id, accounts, log_level)
+        return
+    import multiprocessing
+
+    if len(accounts) < processes:
+        raise ValueError(f"{processes} işçi için en az {processes} hesap gerekli ({len(accounts)} verildi).")
+    workers = [multiprocessing.Process(target=run_queue_worker, name=f"{worker_id}-{i + 1}",
+                                       args=(queue_path, f"{worker_id}-{i + 1}", accounts[i::processes], log_level))
+               for i in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+
+def merge_queue_outputs(queue_path, output_file=None):
+    """Combine every worker's partial workbook into one, dropping tweets seen more than once."""
+    import glob
+
+    work_queue = WorkQueue(queue_path)
+    try:
+        query_params = work_queue.query_params() or {}
+        output_file = output_file or query_params.get('excel_file', DEFAULT_EXCEL_FILE)
+        part_files = sorted(path for path in glob.glob(os.path.join(work_queue.parts_dir, "*.xlsx"))
+                            if not os.path.basename(path).startswith(".~"))
+        counts, failed_units = work_queue.summary(), work_queue.failed_units()
+    finally:
+        work_queue.close()
+
+    callbacks = headless_callbacks("birleştirme")
+    merged = ExcelExporter(output_file, callbacks, autosave_rows=0, autosave_sec=0)
+    id_col, date_col = ExcelExporter.HEADER.index('Tweet ID'), ExcelExporter.HEADER.index('Tarih')
+    rows_by_key = {}
+    for row in merged.rows:
+        rows_by_key.setdefault(row[id_col] if len(row) > id_col and row[id_col] else row[1:], row)
+    sheets = {title: dict.fromkeys(sheet['rows']) for title, sheet in merged.sheets.items()}
+    headers = {title: sheet['header'] for title, sheet in merged.sheets.items()}
+    part_rows = 0
+    for part_file in part_files:
+        part = ExcelExporter(part_file, callbacks, autosave_rows=0, autosave_sec=0)
+        part_rows += len(part.rows)
+        for row in part.rows:
+            rows_by_key.setdefault(row[id_col] if len(row) > id_col and row[id_col] else row[1:], row)
+        for title, sheet in part.sheets.items():
+            headers.setdefault(title, sheet['header'])
+            sheets.setdefault(title, {}).update(dict.fromkeys(sheet['rows']))
+
+    rows = sorted(rows_by_key.values(), key=lambda row: parse_tweet_date(row[date_col]) or datetime.max)
+    merged.rows = [(number,) + tuple(row[1:]) for number, row in enumerate(rows, start=1)]
+    merged.sheets = {title: {'header': headers[title], 'rows': list(sheet_rows)} for title, sheet_rows in sheets.items()}
+    merged.save_workbook()
+    if query_params.get('tweet_store'):
+        store = TweetStore(TweetStore.path_for(output_file))
+        try:
+            store.add_rows(merged.rows)
+        finally:
+            store.close()
+    merged.wait_for_saves()
+    logger.log(OK, "%d parça birleştirildi: %d satırdan %d benzersiz tweet -> '%s'.", len(part_files), part_rows, len(merged.rows), output_file)
+    if counts.get('pending') or counts.get('leased'):
+        logger.warning("Kuyruk henüz bitmedi: %s", counts)
+    for since, until, attempts, error in failed_units:
+        logger.warning("Başarısız birim: %s–%s (%d deneme, %s)", since, until, attempts, error)
+    return output_file
+
+
+def load_accounts(path):
+    """JSON list of {"username", "email", "password"} objects."""
+    import json
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Twitter Web Kazıma")
+    parser.add_argument('--benchmark-startup', action='store_true',
+                        help="Import ve ilk çizim sürelerini ölç ve çık.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Her aralık için cProfile/tracemalloc raporu yaz.")
+    parser.add_argument('--log-level', default=DEFAULT_LOG_LEVEL, choices=LOG_LEVEL_NAMES,
+                        help="Log eşiği (varsayılan: %(default)s).")
+    queue_group = parser.add_argument_group("Dağıtık çalışma", "Paylaşılan SQLite kuyruğu ile birden çok süreç/makine.")
+    queue_group.add_argument('--queue', metavar='DOSYA', help="Paylaşılan iş kuyruğu (SQLite).")
+    queue_group.add_argument('--init-queue', action='store_true', help="Tarih aralığını iş birimlerine bölüp kuyruğa ekle.")
+    queue_group.add_argument('--params', metavar='JSON', help="--init-queue için sorgu parametreleri (arayüzdeki anahtarlar).")
+    queue_group.add_argument('--start-dt', help="Başlangıç (YYYY-MM-DD HH:MM:SS), --params değerini ezer.")
+    queue_group.add_argument('--end-dt', help="Bitiş (YYYY-MM-DD HH:MM:SS), --params değerini ezer.")
+    queue_group.add_argument('--unit-hours', type=int, default=DEFAULT_QUEUE_UNIT_HOURS, help="İş birimi uzunluğu (saat, varsayılan: %(default)s).")
+    queue_group.add_argument('--worker', action='store_true', help="Kuyruktan birim alıp işleyen başsız işçi olarak çalış.")
+    queue_group.add_argument('--worker-id', help="İşçi adı (varsayılan: makine-pid).")
+    queue_group.add_argument('--accounts', metavar='JSON', help="İşçinin hesapları: [{\"username\", \"email\", \"password\"}, ...]")
+    queue_group.add_argument('--processes', type=int, default=1, help="Bu makinede başlatılacak işçi süreci (hesaplar bölüştürülür).")
+    queue_group.add_argument('--merge', action='store_true', help="İşçi çıktılarını birleştirip tekrarları ayıkla.")
+    queue_group.add_argument('--output', help="--merge çıktı dosyası (varsayılan: kuyruktaki excel_file).")
+    args = parser.parse_args(argv)
+    if (args.init_queue or args.worker or args.merge) and not args.queue:
+        parser.error("--init-queue, --worker ve --merge için --queue gerekli.")
+    if args.worker and not args.accounts:
+        parser.error("--worker için --accounts gerekli.")
+    return args
+
+
 if __name__ == '__main__':
-    app = App()
+    args = parse_args()
+    if args.benchmark_startup:
+        run_startup_benchmark()
+        sys.exit(0)
+    if args.init_queue or args.worker or args.merge:
+        import json
+        import socket
+
+        set_log_level(args.log_level)
+        console_handler = start_console_log("kuyruk")
+        if args.init_queue:
+            query_params = {}
+            if args.params:
+                with open(args.params, encoding='utf-8') as f:
+                    query_params = json.load(f)
+            if args.start_dt:
+                query_params['start_dt'] = args.start_dt
+            if args.end_dt:
+                query_params['end_dt'] = args.end_dt
+            init_work_queue(args.queue, query_params, args.unit_hours)
+        if args.worker:
+            logger.removeHandler(console_handler)
+            run_queue_workers(args.queue, args.worker_id or f"{socket.gethostname()}-{os.getpid()}",
+                              load_accounts(args.accounts), args.processes, args.log_level)
+            logger.addHandler(console_handler)
+        if args.merge:
+            merge_queue_outputs(args.queue, args.output)
+        sys.exit(0)
+    app = load_gui()(profile=args.profile, log_level=args.log_level)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()